@@ -6,12 +6,15 @@ arm_make_docs.py
 - 当前目录必须存在 template.md
 - 为每个 bucket（指令集扩展名）新建同名目录（例：armv8）
 - 目录下为清单里的每条指令生成 <规范化指令名>.ts
+- 支持 --clean 先清空各 EXT 目录（清单删掉的指令不会残留旧文件）
 - 文件内容 = template.md，但把“最后一个```代码块```”中的内容替换为【原始指令名】
 
 用法示例见文末。
 """
 import argparse
+import json
 import re
+import shutil
 from pathlib import Path
 
 TEMPLATE_FILE = Path("template.md")
@@ -78,6 +81,16 @@ def write_one(dir_path: Path, instr_name: str, tpl: str):
     content = replace_last_codeblock_content(tpl, instr_name)  # 代码块里写“原始指令名”（保持大小写/括号等）
     dst.write_text(content, encoding="utf-8")
 
+def load_aliases(path: Path) -> dict[str, str]:
+    """读取 fold_aliases.py 生成的索引：{"<bucket>/<原始名>": "<bucket>/<主条目原始名>"}"""
+    return json.loads(path.read_text(encoding="utf-8")).get("aliases", {})
+
+def write_alias(dir_path: Path, instr_name: str, primary_ref: str):
+    # 非主条目只写一行指向主条目的记录，不生成完整 stub
+    p_ext, p_name = primary_ref.split("/", 1)
+    fn = norm_filename(instr_name) + ".alias.txt"
+    (dir_path / fn).write_text(f"{p_ext}/{norm_filename(p_name)}.ts\n", encoding="utf-8")
+
 def main():
     ap = argparse.ArgumentParser(description="从指令清单生成 <指令名>.ts（按扩展名分目录）")
     ap.add_argument(
@@ -88,13 +101,17 @@ def main():
         help="指令集扩展=清单文件路径，如 armv8=armv8_base.txt；可多次传"
     )
     ap.add_argument("--out-root", default=".", help="输出根目录（默认当前目录）")
+    ap.add_argument("--clean", action="store_true", help="生成前先删除对应 EXT 目录（重写）")
+    ap.add_argument("--aliases", help="fold_aliases.py 生成的别名索引；非主条目只写 .alias.txt")
     args = ap.parse_args()
 
     out_root = Path(args.out_root)
     out_root.mkdir(parents=True, exist_ok=True)
 
     tpl = load_template()
+    aliases = load_aliases(Path(args.aliases)) if args.aliases else {}
     total = 0
+    folded = 0
 
     for spec in args.bucket:
         if "=" not in spec:
@@ -109,15 +126,24 @@ def main():
 
         names = read_names(file_path)
         out_dir = out_root / ext
+        if args.clean and out_dir.exists():
+            shutil.rmtree(out_dir)
         out_dir.mkdir(parents=True, exist_ok=True)
 
+        n_alias = 0
         for name in names:
-            write_one(out_dir, name, tpl)
-            total += 1
-
-        print(f"[ok] {ext}: {len(names)} files -> {out_dir}")
-
-    print(f"[done] total files: {total}")
+            primary = aliases.get(f"{ext}/{name}")
+            if primary:
+                write_alias(out_dir, name, primary)
+                n_alias += 1
+            else:
+                write_one(out_dir, name, tpl)
+                total += 1
+        folded += n_alias
+
+        print(f"[ok] {ext}: {len(names) - n_alias} files (+{n_alias} aliases) -> {out_dir}")
+
+    print(f"[done] total files: {total}" + (f", aliases: {folded}" if aliases else ""))
 
 if __name__ == "__main__":
     main()
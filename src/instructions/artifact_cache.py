@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+artifact_cache.py
+按内容寻址的生成产物缓存（bucket 目录 -> 压缩包），目录可以是本地路径，也可以是多台机器共享挂载的路径：
+- 键 = sha256(清单文件, 模板, 生成器脚本/版本, 选项)，由调用方用 cache_key() 计算
+- 条目 = <key[:2]>/<key>.tar.gz + <key>.json（归档的 sha256、大小、文件数）
+- 写入先落临时文件（归档与元数据都用唯一临时名）再 os.replace，多进程/多机并发写同一键也不会读到半截文件
+- 归档字节可复现：固定 mtime/uid/gid/权限与 gzip 头，同一键无论谁写出来都一样，
+  并发覆盖时读方不会因 sha256 不符把有效条目当成损坏删掉
+- 恢复时校验 sha256，不一致则删除该条目按未命中处理
+- LRU：命中时刷新元数据文件 mtime；evict() 按 mtime 从旧到新删除直到总大小不超过上限
+
+refresh.py 通过 --cache-dir 使用；本文件也可单独运行查看/清理缓存：
+  python artifact_cache.py --cache-dir ~/.cache/isa-cosmos stats
+  python artifact_cache.py --cache-dir ~/.cache/isa-cosmos gc --max-size 1G
+
+依赖：无（Python 标准库）
+"""
+import argparse, gzip, hashlib, json, os, shutil, tarfile, tempfile, time
+from pathlib import Path
+
+CACHE_FORMAT = 2   # 2：生成前清空输出目录，旧条目可能混入残留文件，一律作废
+
+def cache_key(*parts) -> str:
+    """parts 可以是 Path（按内容哈希）、str 或 bytes；顺序有意义。"""
+    h = hashlib.sha256(f"isa-cosmos-artifact-v{CACHE_FORMAT}".encode("utf-8"))
+    for p in parts:
+        if isinstance(p, Path):
+            h.update(b"F" + (p.read_bytes() if p.exists() else b"<missing>"))
+        elif isinstance(p, bytes):
+            h.update(b"B" + p)
+        else:
+            h.update(b"S" + str(p).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+def parse_size(s: str) -> int:
+    units = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+    s = s.strip().upper().rstrip("B")
+    if s and s[-1] in units:
+        return int(float(s[:-1]) * units[s[-1]])
+    return int(s)
+
+def _normalized(ti: tarfile.TarInfo) -> tarfile.TarInfo:
+    ti.mtime = 0
+    ti.uid = ti.gid = 0
+    ti.uname = ti.gname = ""
+    ti.mode = 0o755 if ti.mode & 0o111 else 0o644
+    return ti
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+class ArtifactCache:
+    def __init__(self, root, max_bytes: int = 2 << 30):
+        self.root = Path(root).expanduser()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = self.misses = 0
+
+    def _paths(self, key: str) -> tuple[Path, Path]:
+        d = self.root / key[:2]
+        return d / f"{key}.tar.gz", d / f"{key}.json"
+
+    def _drop(self, key: str):
+        for p in self._paths(key):
+            p.unlink(missing_ok=True)
+
+    def get(self, key: str, dest: Path, paths: list[str] | None = None) -> bool:
+        """
+        命中则把归档解包到 dest，返回 True；未命中/损坏返回 False。
+        paths 为空时先清空整个 dest；否则只清空 dest 下的这些子路径（与 put 的 paths 对应）。
+        """
+        archive, meta_path = self._paths(key)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            if file_sha256(archive) != meta["sha256"]:
+                raise ValueError("sha256 mismatch")
+        except FileNotFoundError:
+            self.misses += 1
+            return False
+        except (ValueError, KeyError) as e:
+            print(f"[cache] drop corrupt entry {key[:12]}: {e}")
+            self._drop(key)
+            self.misses += 1
+            return False
+
+        dest = Path(dest)
+        for sub in ([dest / p for p in paths] if paths else [dest]):
+            if sub.exists():
+                shutil.rmtree(sub)
+        dest.mkdir(parents=True, exist_ok=True)
+        with tarfile.open(archive, "r:gz") as tf:
+            if hasattr(tarfile, "data_filter"):
+                tf.extractall(dest, filter="data")
+            else:
+                tf.extractall(dest)
+            # 归档里的 mtime 固定为 0（见 put）；恢复出来的文件按“刚生成”处理，否则 zipfile 等会拒绝 1980 年前的时间戳
+            now = time.time()
+            for m in tf.getmembers():
+                if m.isfile():
+                    os.utime(dest / m.name, (now, now))
+        os.utime(meta_path)  # LRU：刷新最近使用时间
+        self.hits += 1
+        return True
+
+    def put(self, key: str, src: Path, paths: list[str] | None = None) -> None:
+        """把 src（或 src 下的 paths 子目录）打包存为 key。"""
+        archive, meta_path = self._paths(key)
+        archive.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=f".{key[:12]}.", suffix=".tmp", dir=archive.parent)
+        try:
+            n = 0
+            # gzip 头里的 mtime/文件名也固定，tarfile.open("w:gz") 会写入当前时间
+            with os.fdopen(fd, "wb") as raw, \
+                    gzip.GzipFile(filename="", mode="wb", fileobj=raw, mtime=0) as gz, \
+                    tarfile.open(fileobj=gz, mode="w", format=tarfile.GNU_FORMAT) as tf:
+                roots = [Path(src) / p for p in paths] if paths else [Path(src)]
+                for f in sorted(f for r in roots for f in r.rglob("*")):
+                    if f.is_file():
+                        tf.add(f, f.relative_to(src).as_posix(), filter=_normalized); n += 1
+            meta = {"format": CACHE_FORMAT, "sha256": file_sha256(Path(tmp)),
+                    "size": os.path.getsize(tmp), "files": n, "created": time.time()}
+            os.replace(tmp, archive)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        fd, meta_tmp = tempfile.mkstemp(prefix=f".{key[:12]}.", suffix=".json.tmp", dir=archive.parent)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(meta_tmp, meta_path)
+        except BaseException:
+            Path(meta_tmp).unlink(missing_ok=True)
+            raise
+        self.evict()
+
+    def entries(self) -> list[tuple[float, int, str]]:
+        """[(最近使用时间, 字节数, key)]"""
+        out = []
+        for meta_path in self.root.glob("*/*.json"):
+            archive = meta_path.with_suffix(".tar.gz")
+            try:
+                out.append((meta_path.stat().st_mtime, archive.stat().st_size, meta_path.stem))
+            except FileNotFoundError:
+                continue  # 并发清理中
+        return out
+
+    def evict(self, max_bytes: int | None = None) -> int:
+        cap = self.max_bytes if max_bytes is None else max_bytes
+        ents = sorted(self.entries())
+        total = sum(e[1] for e in ents)
+        removed = 0
+        for _, size, key in ents:
+            if total <= cap:
+                break
+            self._drop(key)
+            total -= size; removed += 1
+        return removed
+
+def main():
+    ap = argparse.ArgumentParser(description="生成产物缓存：查看 / 按 LRU 清理")
+    ap.add_argument("--cache-dir", required=True, help="缓存目录（本地或共享挂载路径）")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("stats", help="条目数与总大小")
+    gc = sub.add_parser("gc", help="按 LRU 清理到指定大小以下")
+    gc.add_argument("--max-size", default="2G", help="大小上限（如 500M、2G；默认 2G）")
+    args = ap.parse_args()
+
+    cache = ArtifactCache(args.cache_dir)
+    if args.cmd == "stats":
+        ents = cache.entries()
+        print(f"[ok] {len(ents)} entries, {sum(e[1] for e in ents) / 2**20:.1f} MiB in {cache.root}")
+    else:
+        removed = cache.evict(parse_size(args.max_size))
+        print(f"[ok] evicted {removed} entries")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+build_opcode_tables.py
+构建期把各架构的指令清单编译为 opcode -> 允许的 form / 所属扩展 的查找表，
+registry.ts 的 validateWithRegistry 先查表（O(1)），未知 opcode 直接拒绝，不再进入各校验器。
+抓取的清单并不完整（如 arm 缺 add/ldr、x86 缺 Jcc/CMOVcc 展开），所以：
+- 只有核对过完整性的架构（--complete，默认只有 riscv：riscv.txt 取自 binutils 的 opcode 表，含伪指令）
+  在表里标 "complete": true，registry.ts 只对这些架构拦截未命中的 opcode；其余架构的表只用于查询
+- registry.ts 加载时还会把已注册模块的 opcode 并入可接受集合，有模块的指令不会被本表拦下
+riscv.txt 里混有 .insn 的格式名（r r4 i s b u uj，压缩格式 cr ci ciw css cl cs ca cb cj），不是指令，建表时去掉；
+j（跳转伪指令）与 sb（存字节）同名但确实是指令，保留。
+
+opcode/form 的拆分与 LeftPanel.parseLineToAst 保持一致（小写存储，查表时同样小写）：
+- vadd.vv          -> vadd / vv      （只取第一个点后的一段：fcvt.d.l -> fcvt / d）
+- LDR (immediate)  -> ldr / ""       （括号限定不是 form）
+- VADD.B           -> vadd / b
+- LODS/LODSB/...   -> lods, lodsb, ... 各自一个 opcode
+
+输出（--out-dir，默认 src/instructions/opcodes，构建产物不入库）：<arch>.json
+  {"version": 1, "arch": "riscv", "hash": "<ops 的 sha256 前 16 位>", "complete": true,
+   "exts": ["riscv_i", ...],
+   "ops": {"vadd": [["vi", "vv", "vx"], [12]], "add": [[""], [0, 24]]}}   # [forms, exts 下标]
+
+依赖：无（Python 标准库）
+"""
+import argparse, hashlib, json, re
+from pathlib import Path
+
+from build_search_index import DEFAULT_BUCKETS, DEFAULT_RISCV, HERE, read_list, read_riscv
+
+TABLE_VERSION = 1
+IDENT_RE = re.compile(r"^([A-Za-z0-9_]+)(?:[.·．]([A-Za-z0-9_]+))?")
+COMPLETE_ARCHS = ["riscv"]
+RISCV_FORMAT_TOKENS = {"r", "r4", "i", "s", "b", "u", "uj",
+                       "cr", "ci", "ciw", "css", "cl", "cs", "ca", "cb", "cj"}
+
+def split_opcode_form(name: str) -> list[tuple[str, str]]:
+    base = re.sub(r"\s*\([^)]*\)", "", name).strip()
+    out = []
+    for alt in base.split("/"):
+        m = IDENT_RE.match(alt.strip())
+        if m:
+            out.append((m.group(1).lower(), (m.group(2) or "").lower()))
+    return out
+
+def build_table(arch: str, entries: list[tuple[str, str]], complete: bool = False) -> dict:
+    """entries: [(bucket, 原始名)] -> 查找表 dict"""
+    exts = sorted({b for b, _ in entries})
+    e_idx = {b: i for i, b in enumerate(exts)}
+    forms: dict[str, set[str]] = {}
+    owners: dict[str, set[int]] = {}
+    for bucket, name in entries:
+        for op, form in split_opcode_form(name):
+            forms.setdefault(op, set()).add(form)
+            owners.setdefault(op, set()).add(e_idx[bucket])
+    ops = {op: [sorted(forms[op]), sorted(owners[op])] for op in sorted(forms)}
+    digest = hashlib.sha256(json.dumps(ops, separators=(",", ":")).encode("utf-8")).hexdigest()[:16]
+    return {"version": TABLE_VERSION, "arch": arch, "hash": digest, "complete": complete, "exts": exts, "ops": ops}
+
+def main():
+    ap = argparse.ArgumentParser(description="生成各架构 opcode -> form/扩展 的查找表（供 registry.ts 校验）")
+    ap.add_argument("--out-dir", default=str(HERE / "opcodes"), help="输出目录（默认 src/instructions/opcodes）")
+    ap.add_argument("--include-vendor", action="store_true", help="RISC-V：包含 INSN_CLASS_X* 厂商类")
+    ap.add_argument("--complete", action="append", metavar="ARCH",
+                    help=f"清单已核对完整、未命中即拒绝的架构（可多次；默认 {' '.join(COMPLETE_ARCHS)}）")
+    args = ap.parse_args()
+
+    by_arch: dict[str, list[tuple[str, str]]] = {}
+    for arch, bucket, rel in DEFAULT_BUCKETS:
+        by_arch.setdefault(arch, []).extend((bucket, n) for n in read_list(HERE / rel))
+    by_arch.setdefault("riscv", []).extend(
+        (b, m) for b, m in read_riscv(HERE / DEFAULT_RISCV, args.include_vendor) if m not in RISCV_FORMAT_TOKENS)
+    complete = set(args.complete or COMPLETE_ARCHS)
+
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for arch in sorted(by_arch):
+        table = build_table(arch, by_arch[arch], arch in complete)
+        path = out_dir / f"{arch}.json"
+        path.write_text(json.dumps(table, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+        gate = "complete" if table["complete"] else "lookup only"
+        print(f"[ok] {arch}: {len(table['ops'])} opcodes ({gate}), {path.stat().st_size / 1024:.0f} KB -> {path}")
+    print(f"[done] tables -> {out_dir}")
+
+if __name__ == "__main__":
+    main()
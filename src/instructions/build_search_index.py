@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+build_search_index.py
+构建期生成指令目录的搜索索引（按架构分片，前端按需懒加载），替代逐条 includes 的线性扫描。
+
+输出（--out-dir，默认 <repo>/public/search-index）：
+- manifest.json : {"version", "shards": {arch: {"file", "count", "sha256"}}}
+- <arch>.json   : 单个架构的分片
+    {
+      "version": 1, "arch": "riscv",
+      "buckets": ["riscv_i", ...],             # 扩展/目录名
+      "names":   ["add", "LDR (immediate)", ...],   # 原始指令名（按 keys 排序后的文档顺序）
+      "keys":    ["add", "ldr (immediate)", ...],   # 小写检索键，已排序（结果按此顺序返回）
+      "bucket":  [0, 3, ...],                  # 每个文档所属 bucket 下标
+      "trigrams": {"add": [0, 12, 3], ...}      # 三元组倒排表，文档号升序、差分编码
+    }
+
+查询约定（与 LeftPanel 目录过滤的 includes 子串语义一致）：
+- 长度 < 3 的查询：对 keys 逐条 includes 线性扫描（单个分片最多几千条；
+  一两个字母本来就会命中大量条目，单/双字母倒排表省不了多少，还会让分片变大）
+- 否则对查询的各三元组倒排表求交，再对候选做一次 includes 校验（三元组只保证必要条件）
+
+默认输入即各架构目录下的清单文件（与 run_*.sh / gen_riscv.py 的分桶一致），也可用
+--bucket ARCH:EXT=FILE / --riscv FILE 自行指定。
+
+依赖：无（Python 标准库）
+"""
+import argparse, hashlib, json, re
+from pathlib import Path
+
+INDEX_VERSION = 1
+HERE = Path(__file__).resolve().parent
+CLASS_RE = re.compile(r"^INSN_CLASS_[A-Z0-9_]+$")
+MNEM_RE = re.compile(r"^[a-z0-9_.]+$")
+
+# 默认输入：(arch, bucket, 清单文件)；RISC-V 单独按 class 分桶
+DEFAULT_BUCKETS = [
+    ("arm", "armv7", "arm/armv7_list.txt"),
+    ("arm", "armv8-base", "arm/armv8_base.txt"),
+    ("arm", "armv8-simdfp", "arm/armv8_simdfp.txt"),
+    ("arm", "armv8-sve", "arm/armv8_sve.txt"),
+    ("arm", "armv9-sme", "arm/armv9_sme.txt"),
+    ("loongarch", "loongarch", "loongarch/loongarch_base.txt"),
+    ("loongarch", "loongarch-lsx", "loongarch/loongarch_lsx.txt"),
+    ("loongarch", "loongarch-lasx", "loongarch/loongarch_lasx.txt"),
+    ("x86", "x86", "x86/x86_intel.txt"),
+]
+DEFAULT_RISCV = "riscv/riscv.txt"
+
+def read_list(path: Path) -> list[str]:
+    seen, out = set(), []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        n = line.strip()
+        if not n or n in seen:
+            continue
+        seen.add(n); out.append(n)
+    return out
+
+def class_to_bucket(insn_class: str) -> str:
+    # 与 riscv/gen_riscv.py 保持一致：INSN_CLASS_D_AND_ZFA -> riscv_d
+    body = insn_class[len("INSN_CLASS_"):]
+    body = body.split("_AND_")[0].split("_OR_")[0]
+    return f"riscv_{body.lower()}"
+
+def read_riscv(path: Path, include_vendor: bool = False) -> list[tuple[str, str]]:
+    out, seen = [], set()
+    for raw in path.read_text(encoding="utf-8").splitlines():
+        toks = raw.replace(":", " ").split()
+        if not toks or not CLASS_RE.match(toks[0]):
+            continue
+        if not include_vendor and toks[0].startswith("INSN_CLASS_X"):
+            continue
+        bucket = class_to_bucket(toks[0])
+        for t in toks[1:]:
+            if MNEM_RE.match(t) and (bucket, t) not in seen:
+                seen.add((bucket, t)); out.append((bucket, t))
+    return out
+
+def search_key(name: str) -> str:
+    return re.sub(r"\s+", " ", name.strip().lower())
+
+def trigrams(key: str) -> set[str]:
+    return {key[i:i + 3] for i in range(len(key) - 2)}
+
+def build_shard(arch: str, entries: list[tuple[str, str]]) -> dict:
+    """entries: [(bucket, 原始名)] -> 分片 dict"""
+    buckets = sorted({b for b, _ in entries})
+    b_idx = {b: i for i, b in enumerate(buckets)}
+    docs = sorted(set(entries), key=lambda e: (search_key(e[1]), e[0], e[1]))
+    keys = [search_key(n) for _, n in docs]
+
+    postings: dict[str, list[int]] = {}
+    for doc_id, k in enumerate(keys):
+        for g in trigrams(k):
+            postings.setdefault(g, []).append(doc_id)
+    # 文档号天然升序；差分编码让 JSON 里大多是小整数
+    delta = {}
+    for g in sorted(postings):
+        ids, prev, out = postings[g], 0, []
+        for i in ids:
+            out.append(i - prev); prev = i
+        delta[g] = out
+
+    return {
+        "version": INDEX_VERSION,
+        "arch": arch,
+        "buckets": buckets,
+        "names": [n for _, n in docs],
+        "keys": keys,
+        "bucket": [b_idx[b] for b, _ in docs],
+        "trigrams": delta,
+    }
+
+def query(shard: dict, q: str) -> list[int]:
+    """参考实现（与前端约定一致），返回命中的文档号。"""
+    q = search_key(q)
+    keys = shard["keys"]
+    if not q:
+        return list(range(len(keys)))
+    if len(q) < 3:
+        return [i for i, k in enumerate(keys) if q in k]
+    cand = None
+    for g in trigrams(q):
+        ids, acc = set(), 0
+        for d in shard["trigrams"].get(g, []):
+            acc += d; ids.add(acc)
+        cand = ids if cand is None else cand & ids
+        if not cand:
+            return []
+    return sorted(i for i in cand if q in keys[i])
+
+def write_json(path: Path, data: dict) -> str:
+    raw = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    path.write_bytes(raw)
+    return hashlib.sha256(raw).hexdigest()
+
+def main():
+    ap = argparse.ArgumentParser(description="生成按架构分片的指令搜索索引（排序检索键 + 三元组倒排）")
+    ap.add_argument("--bucket", action="append", default=[], metavar="ARCH:EXT=FILE",
+                    help="架构:扩展=清单文件（可多次）；不传 --bucket/--riscv 时使用内置默认清单")
+    ap.add_argument("--riscv", metavar="FILE", help="RISC-V 'INSN_CLASS_*: ...' 格式清单")
+    ap.add_argument("--include-vendor", action="store_true", help="RISC-V：包含 INSN_CLASS_X* 厂商类")
+    ap.add_argument("--out-dir", default=str(HERE.parent.parent / "public" / "search-index"),
+                    help="输出目录（默认 public/search-index）")
+    args = ap.parse_args()
+
+    by_arch: dict[str, list[tuple[str, str]]] = {}
+    if not args.bucket and not args.riscv:
+        specs = [(a, e, HERE / f) for a, e, f in DEFAULT_BUCKETS]
+        riscv = HERE / DEFAULT_RISCV
+    else:
+        specs, riscv = [], Path(args.riscv) if args.riscv else None
+        for spec in args.bucket:
+            if "=" not in spec or ":" not in spec.split("=", 1)[0]:
+                raise ValueError(f"--bucket 格式错误：{spec}（应为 ARCH:EXT=FILE）")
+            lhs, file_path = [x.strip() for x in spec.split("=", 1)]
+            arch, ext = [x.strip() for x in lhs.split(":", 1)]
+            specs.append((arch, ext, Path(file_path)))
+
+    for arch, ext, path in specs:
+        if not path.exists():
+            raise FileNotFoundError(f"找不到清单文件：{path}")
+        by_arch.setdefault(arch, []).extend((ext, n) for n in read_list(path))
+    if riscv:
+        if not riscv.exists():
+            raise FileNotFoundError(f"找不到清单文件：{riscv}")
+        by_arch.setdefault("riscv", []).extend(read_riscv(riscv, args.include_vendor))
+
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest = {"version": INDEX_VERSION, "shards": {}}
+    for arch in sorted(by_arch):
+        shard = build_shard(arch, by_arch[arch])
+        fn = f"{arch}.json"
+        digest = write_json(out_dir / fn, shard)
+        manifest["shards"][arch] = {"file": fn, "count": len(shard["names"]), "sha256": digest}
+        size_kb = (out_dir / fn).stat().st_size / 1024
+        print(f"[ok] {arch}: {len(shard['names'])} names, {len(shard['trigrams'])} trigrams, "
+              f"{size_kb:.0f} KB -> {out_dir / fn}")
+    write_json(out_dir / "manifest.json", manifest)
+    print(f"[done] manifest -> {out_dir / 'manifest.json'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+fold_aliases.py
+跨 bucket 的别名折叠：把“同一条语义指令”的多个清单条目归并为一个等价类，
+每类只保留一个主条目（生成完整 stub / 跑一次模型），其余条目只生成轻量别名记录。
+
+规范键 = (扩展族, 规范化助记符)：
+- 规范化助记符：小写；去掉括号限定（LDR (immediate) / LDR (register) -> ldr）；
+  RISC-V 的内存序后缀 .aq/.rl/.aqrl 去掉（amoadd.w.aq -> amoadd.w）
+- "A/B/C" 形式的条目按备选名集合比较：同族内两条斜杠条目的集合互为子集时才归一
+  （LODS/.../LODSD 与 LODS/.../LODSQ、LOOPNZ/LOOPNE 与 LOOPNE/LOOPNZ）；
+  单个名字只与完全相同的键归一，MOVSX 与 MOVSX/MOVSXD 是不同指令，各自为主条目
+- 扩展族：默认 = bucket 名去掉 _inx / -inx 后缀（riscv_f_inx -> riscv_f）；
+  可用 --family EXT=FAM 覆盖；FAM 为 * 表示“汇总清单”，其条目并入本次已出现的任一族
+  （如 arm_all_instructions.txt 与 armv8_base.txt 的重叠）
+
+输出 JSON 索引（--out，默认 aliases.json），供各 *_make_docs.py / gen_riscv.py 的 --aliases 使用：
+  {"version": 1, "aliases": {"<bucket>/<原始名>": "<bucket>/<原始名>"}, "classes": {...}, "stats": {...}}
+
+依赖：无（Python 标准库）
+
+示例：
+  python fold_aliases.py --out arm/aliases.json --template arm/template.md \
+    --bucket armv8-base=arm/armv8_base.txt --bucket armv8-simdfp=arm/armv8_simdfp.txt \
+    --bucket arm-all=arm/arm_all_instructions.txt --family arm-all=*
+  python fold_aliases.py --out riscv/aliases.json --riscv riscv/riscv.txt
+"""
+import argparse, json, re
+from pathlib import Path
+
+INDEX_VERSION = 1
+CLASS_RE = re.compile(r"^INSN_CLASS_[A-Z0-9_]+$")
+MNEM_RE = re.compile(r"^[a-z0-9_.]+$")
+ORDER_SUFFIX_RE = re.compile(r"\.(aqrl|aq|rl)$")
+ANY_FAMILY = "*"
+
+def read_list(path: Path) -> list[str]:
+    seen, out = set(), []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        n = line.strip()
+        if not n or n in seen:
+            continue
+        seen.add(n); out.append(n)
+    return out
+
+def class_to_bucket(insn_class: str) -> str:
+    # 与 riscv/gen_riscv.py 保持一致：INSN_CLASS_D_AND_ZFA -> riscv_d
+    body = insn_class[len("INSN_CLASS_"):]
+    body = body.split("_AND_")[0].split("_OR_")[0]
+    return f"riscv_{body.lower()}"
+
+def read_riscv(path: Path, include_vendor: bool) -> list[tuple[str, list[str]]]:
+    """解析 'INSN_CLASS_V: vadd.vv vadd.vx ...' 格式，按 bucket 聚合（保序）。"""
+    buckets: dict[str, list[str]] = {}
+    for raw in path.read_text(encoding="utf-8").splitlines():
+        toks = raw.replace(":", " ").split()
+        if not toks or not CLASS_RE.match(toks[0]):
+            continue
+        if not include_vendor and toks[0].startswith("INSN_CLASS_X"):
+            continue
+        names = buckets.setdefault(class_to_bucket(toks[0]), [])
+        for t in toks[1:]:
+            if MNEM_RE.match(t) and t not in names:
+                names.append(t)
+    return list(buckets.items())
+
+def alternates(name: str) -> frozenset[str]:
+    s = re.sub(r"\s*\([^)]*\)", "", name.lower())
+    s = re.sub(r"\s+", " ", s).strip()
+    parts = {ORDER_SUFFIX_RE.sub("", p.strip()) for p in s.split("/")} - {""}
+    return frozenset(parts or {name.lower()})
+
+def norm_mnemonic(name: str) -> str:
+    return "/".join(sorted(alternates(name)))
+
+def default_family(ext: str) -> str:
+    return re.sub(r"[_-]inx$", "", ext.lower())
+
+def fold(buckets: list[tuple[str, list[str]]], families: dict[str, str]) -> dict:
+    """
+    buckets: [(ext, [原始名...])]，顺序即优先级（先出现者为主条目）。
+    返回索引 dict（见文件头）。
+    """
+    classes: dict[tuple[str, str], dict] = {}
+    by_mnem: dict[str, tuple[str, str]] = {}   # 规范化助记符 -> 第一个出现的规范键（供 * 族使用）
+    slashed: list[tuple[frozenset[str], tuple[str, str]]] = []   # 斜杠条目的备选名集合 -> 所属规范键
+    aliases: dict[str, str] = {}
+    total = 0
+
+    def find_slashed(fam: str, alts: frozenset[str]) -> tuple[str, str] | None:
+        if len(alts) < 2:
+            return None
+        for other, key in slashed:
+            if (fam == ANY_FAMILY or key[0] == fam) and (alts <= other or other <= alts):
+                return key
+        return None
+
+    for ext, names in buckets:
+        fam = families.get(ext, default_family(ext))
+        for n in names:
+            total += 1
+            alts = alternates(n)
+            mnem = norm_mnemonic(n)
+            exact = by_mnem.get(mnem) if fam == ANY_FAMILY else (fam, mnem)
+            key = exact if exact in classes else find_slashed(fam, alts) or exact
+            ref = f"{ext}/{n}"
+            if key is None:
+                key = (ext, mnem)  # 汇总清单独有的条目：以自身为族
+            cls = classes.get(key)
+            if cls is None:
+                classes[key] = {"primary": ref, "aliases": []}
+                by_mnem.setdefault(mnem, key)
+            else:
+                cls["aliases"].append(ref)
+                aliases[ref] = cls["primary"]
+            if len(alts) > 1:
+                slashed.append((alts, key))
+    return {
+        "version": INDEX_VERSION,
+        "aliases": aliases,
+        "classes": {f"{f}:{m}": c for (f, m), c in classes.items() if c["aliases"]},
+        "stats": {"names": total, "primaries": len(classes), "aliases": len(aliases)},
+    }
+
+def main():
+    ap = argparse.ArgumentParser(description="跨 bucket 别名折叠：生成规范键索引，减少重复 stub 与模型调用")
+    ap.add_argument("--bucket", action="append", default=[], metavar="EXT=FILE",
+                    help="扩展=清单文件（可多次，顺序即主条目优先级）")
+    ap.add_argument("--riscv", metavar="FILE", help="RISC-V 'INSN_CLASS_*: ...' 格式清单（按 class_to_bucket 分桶）")
+    ap.add_argument("--include-vendor", action="store_true", help="RISC-V：包含 INSN_CLASS_X* 厂商类")
+    ap.add_argument("--family", action="append", default=[], metavar="EXT=FAM",
+                    help="覆盖某 bucket 的扩展族；FAM=* 表示汇总清单，并入任一已出现的族")
+    ap.add_argument("--template", help="可选：模板文件，用于估算节省的提示词字节数")
+    ap.add_argument("--out", default="aliases.json", help="输出索引 JSON（默认 aliases.json）")
+    args = ap.parse_args()
+
+    buckets: list[tuple[str, list[str]]] = []
+    if args.riscv:
+        buckets += read_riscv(Path(args.riscv), args.include_vendor)
+    for spec in args.bucket:
+        if "=" not in spec:
+            raise ValueError(f"--bucket 格式错误：{spec}（应为 EXT=FILE）")
+        ext, file_path = [x.strip() for x in spec.split("=", 1)]
+        in_file = Path(file_path)
+        if not in_file.exists():
+            raise FileNotFoundError(f"找不到清单文件：{in_file}")
+        buckets.append((ext, read_list(in_file)))
+    if not buckets:
+        raise SystemExit("需要至少一个 --bucket 或 --riscv")
+
+    families = {}
+    for spec in args.family:
+        if "=" not in spec:
+            raise ValueError(f"--family 格式错误：{spec}（应为 EXT=FAM）")
+        ext, fam = [x.strip() for x in spec.split("=", 1)]
+        families[ext] = fam
+
+    index = fold(buckets, families)
+    Path(args.out).write_text(json.dumps(index, ensure_ascii=False, indent=1) + "\n", encoding="utf-8")
+
+    st = index["stats"]
+    per_bucket: dict[str, int] = {}
+    for ref in index["aliases"]:
+        b = ref.split("/", 1)[0]
+        per_bucket[b] = per_bucket.get(b, 0) + 1
+    if per_bucket:
+        width = max(len(k) for k in per_bucket)
+        for k in sorted(per_bucket):
+            print(f"{k.ljust(width)} : {per_bucket[k]} aliases")
+    saved = f"{st['aliases']} stubs / prompts saved"
+    if args.template:
+        kb = st["aliases"] * Path(args.template).stat().st_size / 1024
+        saved += f" (~{kb:.0f} KB of prompt text)"
+    print(f"[ok] {st['names']} names -> {st['primaries']} primaries + {st['aliases']} aliases; {saved}")
+    print(f"[done] index -> {args.out}")
+
+if __name__ == "__main__":
+    main()
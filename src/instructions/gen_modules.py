@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+gen_modules.py
+批量把 <指令名>.ts.txt（模板 + 指令名，即完整提示词）发给模型端点，
+把返回内容写成同目录下的 <指令名>.ts 模块：
+- asyncio 并发（--concurrency 限制同时在途请求数）
+- 令牌桶限速（--rps / --burst）
+- 失败重试 + 指数退避（429/5xx/网络错误；尊重 Retry-After）
+- 结果日志（JSONL，--journal）可断点续跑：已成功的条目与已有 .ts 的指令直接跳过
+- 原子写入：先写同目录临时文件，再 os.replace
+- 结束时输出吞吐量与延迟分位数（p50/p90/p99）
+
+端点协议：OpenAI 兼容的 chat completions
+  POST <endpoint>  {"model": ..., "messages": [{"role": "user", "content": <提示词>}]}
+  返回 choices[0].message.content
+API Key 从环境变量读取（默认 OPENAI_API_KEY，可用 --api-key-env 修改）。
+
+依赖：无（Python 标准库）
+
+示例：
+  python gen_modules.py --root . --arch riscv \
+    --endpoint http://127.0.0.1:8000/v1/chat/completions --model my-model \
+    --concurrency 16 --rps 8
+"""
+import argparse, asyncio, json, os, random, re, sys, tempfile, time
+import urllib.error, urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+STUB_SUFFIX = ".ts.txt"
+RETRY_STATUS = {408, 429, 500, 502, 503, 504}
+
+class RetryableError(Exception):
+    def __init__(self, msg: str, retry_after: float | None = None):
+        super().__init__(msg)
+        self.retry_after = retry_after
+
+class TokenBucket:
+    """简单令牌桶：rate 个/秒，容量 burst；rate<=0 表示不限速。"""
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.last = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+                self.last = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+def module_path(stub: Path) -> Path:
+    # add.ts.txt -> add.ts
+    return stub.with_name(stub.name[: -len(".txt")])
+
+def find_stubs(root: Path, archs: list[str] | None) -> list[Path]:
+    dirs = [root / a for a in archs] if archs else [root]
+    out = []
+    for d in dirs:
+        if not d.is_dir():
+            raise FileNotFoundError(f"找不到目录：{d}")
+        out += sorted(d.rglob("*" + STUB_SUFFIX))
+    return out
+
+def load_journal(path: Path) -> set[str]:
+    """读取结果日志，返回已成功的 stub（相对路径）集合；后写的记录覆盖先写的。"""
+    done: dict[str, bool] = {}
+    if not path.exists():
+        return set()
+    for line in path.read_text(encoding="utf-8").splitlines():
+        try:
+            rec = json.loads(line)
+        except ValueError:
+            continue  # 上次中断时可能留下半行
+        done[rec["stub"]] = rec.get("status") == "ok"
+    return {k for k, ok in done.items() if ok}
+
+def strip_code_fence(text: str) -> str:
+    # 模板要求不输出 Markdown 代码块，但模型偶尔仍会包一层 ```ts ... ```
+    m = re.fullmatch(r"\s*```[A-Za-z]*\n(.*?)\n?```\s*", text, re.DOTALL)
+    body = m.group(1) if m else text
+    return body.rstrip() + "\n"
+
+def write_atomic(dst: Path, content: str):
+    fd, tmp = tempfile.mkstemp(prefix="." + dst.name + ".", suffix=".tmp", dir=dst.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp, dst)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+def post_prompt(endpoint: str, model: str, prompt: str, api_key: str | None, timeout: float) -> str:
+    body = json.dumps({"model": model, "messages": [{"role": "user", "content": prompt}]}).encode("utf-8")
+    headers = {"Content-Type": "application/json"}
+    if api_key:
+        headers["Authorization"] = f"Bearer {api_key}"
+    req = urllib.request.Request(endpoint, data=body, headers=headers, method="POST")
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as r:
+            data = json.loads(r.read().decode("utf-8"))
+    except urllib.error.HTTPError as e:
+        if e.code in RETRY_STATUS:
+            ra = e.headers.get("Retry-After")
+            raise RetryableError(f"HTTP {e.code}", float(ra) if ra and ra.isdigit() else None)
+        raise
+    except (urllib.error.URLError, TimeoutError, ConnectionError) as e:
+        raise RetryableError(str(e))
+    content = data["choices"][0]["message"]["content"]
+    if not content or not content.strip():
+        raise RetryableError("empty response")
+    return content
+
+def percentile(xs: list[float], p: float) -> float:
+    if not xs:
+        return 0.0
+    s = sorted(xs)
+    k = (len(s) - 1) * p / 100
+    lo, hi = int(k), min(int(k) + 1, len(s) - 1)
+    return s[lo] + (s[hi] - s[lo]) * (k - lo)
+
+async def run(args) -> int:
+    root = Path(args.root)
+    journal_path = Path(args.journal)
+    api_key = os.environ.get(args.api_key_env)
+
+    done = load_journal(journal_path)
+    todo, skipped = [], 0
+    for stub in find_stubs(root, args.arch):
+        rel = stub.relative_to(root).as_posix()
+        if module_path(stub).exists() or rel in done:
+            skipped += 1
+            continue
+        todo.append((stub, rel))
+    if args.limit:
+        todo = todo[: args.limit]
+    print(f"[info] {len(todo)} to generate, {skipped} skipped (module exists / journaled)")
+    if not todo:
+        return 0
+
+    bucket = TokenBucket(args.rps, args.burst)
+    sem = asyncio.Semaphore(args.concurrency)
+    journal = journal_path.open("a", encoding="utf-8")
+    latencies: list[float] = []
+    stats = {"ok": 0, "fail": 0}
+
+    async def one(stub: Path, rel: str):
+        rec = None
+        async with sem:
+            try:
+                prompt = stub.read_text(encoding="utf-8")
+            except OSError as e:
+                prompt, rec = None, {"stub": rel, "status": "fail", "attempts": 0, "error": repr(e)}
+            for attempt in (range(1, args.retries + 2) if prompt is not None else ()):
+                await bucket.acquire()
+                t0 = time.monotonic()
+                try:
+                    text = await asyncio.to_thread(post_prompt, args.endpoint, args.model,
+                                                   prompt, api_key, args.timeout)
+                except RetryableError as e:
+                    rec = {"stub": rel, "status": "fail", "attempts": attempt, "error": str(e)}
+                    if attempt > args.retries:
+                        break
+                    delay = e.retry_after or args.backoff * (2 ** (attempt - 1))
+                    await asyncio.sleep(delay * random.uniform(0.8, 1.2))
+                    continue
+                except Exception as e:
+                    rec = {"stub": rel, "status": "fail", "attempts": attempt, "error": repr(e)}
+                    break
+                dt = time.monotonic() - t0
+                latencies.append(dt)
+                try:
+                    write_atomic(module_path(stub), strip_code_fence(text))
+                except OSError as e:
+                    # 磁盘满/权限等：记为失败继续跑，不能让异常穿出 gather 丢掉其它在途请求
+                    rec = {"stub": rel, "status": "fail", "attempts": attempt, "error": repr(e)}
+                    break
+                rec = {"stub": rel, "status": "ok", "attempts": attempt, "latency_ms": round(dt * 1000, 1)}
+                break
+        stats[rec["status"]] += 1
+        if rec["status"] == "fail":
+            print(f"[fail] {rel}: {rec['error']}", file=sys.stderr)
+        journal.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        journal.flush()
+        n = stats["ok"] + stats["fail"]
+        if n % args.progress_every == 0 or n == len(todo):
+            print(f"[progress] {n}/{len(todo)} ok={stats['ok']} fail={stats['fail']}")
+
+    # to_thread 默认线程池只有 min(32, cpu+4) 个线程，会悄悄压低并发上限
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=args.concurrency))
+    t_start = time.monotonic()
+    try:
+        await asyncio.gather(*(one(s, r) for s, r in todo))
+    finally:
+        journal.close()
+    wall = time.monotonic() - t_start
+
+    print(f"[done] ok={stats['ok']} fail={stats['fail']} in {wall:.1f}s "
+          f"({stats['ok'] / wall if wall else 0:.2f} modules/s)")
+    if latencies:
+        ms = [x * 1000 for x in latencies]
+        print(f"[latency] p50={percentile(ms, 50):.0f}ms p90={percentile(ms, 90):.0f}ms "
+              f"p99={percentile(ms, 99):.0f}ms max={max(ms):.0f}ms")
+    return 1 if stats["fail"] else 0
+
+def main():
+    ap = argparse.ArgumentParser(description="并发批量调用模型，把 *.ts.txt 提示词生成为 *.ts 模块（可断点续跑）")
+    ap.add_argument("--root", default=".", help="指令根目录（默认当前目录，即 src/instructions）")
+    ap.add_argument("--arch", action="append",
+                    help="只处理某个子目录（如 riscv、arm/armv7）；可多次传，默认全部")
+    ap.add_argument("--endpoint", required=True, help="chat completions 端点 URL")
+    ap.add_argument("--model", default="", help="请求体中的 model 字段")
+    ap.add_argument("--api-key-env", default="OPENAI_API_KEY", help="读取 API Key 的环境变量名")
+    ap.add_argument("--concurrency", type=int, default=8, help="最大并发请求数（默认 8）")
+    ap.add_argument("--rps", type=float, default=4.0, help="每秒请求数上限；<=0 不限速（默认 4）")
+    ap.add_argument("--burst", type=int, default=8, help="令牌桶容量（默认 8）")
+    ap.add_argument("--retries", type=int, default=5, help="可重试错误的最大重试次数（默认 5）")
+    ap.add_argument("--backoff", type=float, default=2.0, help="退避基数（秒，指数增长，默认 2）")
+    ap.add_argument("--timeout", type=float, default=300.0, help="单次请求超时（秒）")
+    ap.add_argument("--journal", default="gen_modules.journal.jsonl", help="结果日志（JSONL，用于续跑）")
+    ap.add_argument("--limit", type=int, default=0, help="本次最多处理多少条（0 = 不限）")
+    ap.add_argument("--progress-every", type=int, default=50, help="每完成多少条打印一次进度")
+    args = ap.parse_args()
+    sys.exit(asyncio.run(run(args)))
+
+if __name__ == "__main__":
+    main()
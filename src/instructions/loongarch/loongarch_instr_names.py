@@ -7,12 +7,15 @@ loongarch_instr_names.py
 - lsx  : 来自非官方 intrinsics 指南（/lsx/ 子页的 "Instruction: <mnemonic>"）
 - lasx : 同上，/lasx/ 子页
 
+base 页会同时对冲 docs.kernel.org 与 kernel.org 镜像（--hedge-delay 错峰、--mirror 追加候选），
+取第一个含 “List of Instructions” 的页面，其余取消，并打印每个镜像的状态与耗时。
+
 输出：<out>.txt（每行一个指令名）与 <out>.csv（name 一列）
 
 依赖：requests, beautifulsoup4, lxml, tqdm
 pip install requests beautifulsoup4 lxml tqdm
 """
-import argparse, re, csv, os, io
+import argparse, re, csv, os, io, queue, threading, time
 from urllib.parse import urljoin, urlparse
 import requests
 from bs4 import BeautifulSoup
@@ -22,9 +25,14 @@ from urllib3.util.retry import Retry
 
 UA = {"User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 Safari/537.36"}
 
-def make_session():
+KERNEL_DOC_MIRRORS = [
+    "https://www.kernel.org/doc/html/latest/arch/loongarch/introduction.html",
+    "https://www.kernel.org/doc/html/v6.6/arch/loongarch/introduction.html",
+]
+
+def make_session(retries=5):
     s = requests.Session()
-    retries = Retry(total=5, backoff_factor=0.5,
+    retries = Retry(total=retries, backoff_factor=0.5,
                     status_forcelist=[429, 500, 502, 503, 504],
                     allowed_methods=["GET", "HEAD"])
     s.mount("https://", HTTPAdapter(max_retries=retries))
@@ -75,44 +83,118 @@ def extract_upper_tokens(blob: str):
             out.append(s)
     return out
 
-def collect_loongarch_base(url):
+class Cancelled(Exception):
+    pass
+
+def fetch_cancellable(url, stop, timeout=30, retries=2):
+    """分块读取响应体，每块检查 stop；被取消时抛 Cancelled 并关闭连接。"""
+    if url.startswith("file://"):
+        return fetch(url).text
+    s = make_session(retries)
+    with s.get(url, timeout=timeout, allow_redirects=True, stream=True) as r:
+        r.raise_for_status()
+        chunks = []
+        for chunk in r.iter_content(chunk_size=64 * 1024):
+            if stop.is_set():
+                raise Cancelled()
+            chunks.append(chunk)
+        return b"".join(chunks).decode(r.encoding or "utf-8", errors="replace")
+
+def find_instruction_list(html):
+    """返回 “List of Instructions” 小节的助记符；页面没有该小节时返回 None。"""
+    soup = BeautifulSoup(html, "lxml")
+    header = None
+    for tag in soup.find_all(["h2","h3","h4"]):
+        t = tag.get_text(" ", strip=True)
+        if "List of Instructions" in t or t.startswith("1.2.2"):
+            header = tag; break
+    if not header:
+        return None
+
+    node = header.next_sibling
+    texts, stop = [], {"h2","h3","h4"}
+    while node:
+        if getattr(node, "name", None) in stop:
+            break
+        if hasattr(node, "get_text"):
+            texts.append(node.get_text(" ", strip=True))
+        node = node.next_sibling
+    blob = "\n".join(texts)
+    return extract_upper_tokens(blob)
+
+def hedged_fetch(urls, hedge_delay=0.5, timeout=30):
+    """
+    对冲抓取：第 i 个镜像在 i*hedge_delay 秒后启动（0 = 同时起跑），
+    第一个含 “List of Instructions” 小节的页面胜出，其余立即取消。
+    返回 (胜出 url 或 None, 解析结果, 报告)；报告为 {url: {"status", "seconds"}}。
+    没有任何页面含该小节时，退回第一个成功抓到的页面的全文提取（与旧逻辑一致）。
+    """
+    stop = threading.Event()
+    results = queue.Queue()
+    t0 = time.monotonic()
+    report = {u: {"status": "pending", "seconds": None} for u in urls}
+
+    def worker(i, u):
+        if stop.wait(i * hedge_delay):
+            results.put((u, "cancelled", None)); return
+        started = time.monotonic()
+        try:
+            html = fetch_cancellable(u, stop, timeout=timeout)
+            names = find_instruction_list(html)
+            outcome = ("ok", names) if names is not None else ("invalid", html)
+        except Cancelled:
+            outcome = ("cancelled", None)
+        except Exception as e:
+            outcome = (f"error: {e}", None)
+        report[u]["seconds"] = round(time.monotonic() - started, 3)
+        results.put((u, *outcome))
+
+    # daemon 线程：卡在建连/重试里的慢镜像不会拖住进程退出
+    for i, u in enumerate(urls):
+        threading.Thread(target=worker, args=(i, u), daemon=True).start()
+
+    winner, names, fallback_html = None, None, None
+    for _ in urls:
+        u, status, payload = results.get()
+        report[u]["status"] = status
+        if status == "ok":
+            winner, names = u, payload
+            break
+        if status == "invalid" and fallback_html is None:
+            fallback_html = payload
+    stop.set()
+
+    for u, r in report.items():
+        if r["status"] == "pending":
+            r["status"] = "cancelled"
+            r["seconds"] = round(time.monotonic() - t0, 3)
+    if winner:
+        report[winner]["status"] = "won"
+    elif fallback_html is not None:
+        soup = BeautifulSoup(fallback_html, "lxml")
+        names = extract_upper_tokens(soup.get_text("\n", strip=True))
+    for u, r in report.items():
+        secs = f"{r['seconds']:.2f}s" if r["seconds"] is not None else "-"
+        print(f"[mirror] {r['status']:<10} {secs:>7}  {u}")
+    return winner, names, report
+
+def collect_loongarch_base(url, mirrors=(), hedge_delay=0.5):
     """
     从 Kernel 文档页面抓 “List of Instructions” 小节中的助记符。
-    自动回退到 kernel.org 镜像路径以避免偶发 SSL/网络问题。
+    同时对冲 kernel.org 镜像（见 hedged_fetch），一个慢镜像不会拖住整体。
     """
     candidates = [url]
     if "docs.kernel.org" in url:
-        candidates.append("https://www.kernel.org/doc/html/latest/arch/loongarch/introduction.html")
-        candidates.append("https://www.kernel.org/doc/html/v6.6/arch/loongarch/introduction.html")
+        candidates += KERNEL_DOC_MIRRORS
+    candidates += [m for m in mirrors if m not in candidates]
 
-    last_err = None
-    for u in candidates:
-        try:
-            html = fetch(u).text
-            soup = BeautifulSoup(html, "lxml")
-            header = None
-            for tag in soup.find_all(["h2","h3","h4"]):
-                t = tag.get_text(" ", strip=True)
-                if "List of Instructions" in t or t.startswith("1.2.2"):
-                    header = tag; break
-            if not header:
-                text = soup.get_text("\n", strip=True)
-                return extract_upper_tokens(text)
-
-            node = header.next_sibling
-            texts, stop = [], {"h2","h3","h4"}
-            while node:
-                if getattr(node, "name", None) in stop:
-                    break
-                if hasattr(node, "get_text"):
-                    texts.append(node.get_text(" ", strip=True))
-                node = node.next_sibling
-            blob = "\n".join(texts)
-            return extract_upper_tokens(blob)
-        except Exception as e:
-            last_err = e
-            continue
-    raise last_err
+    winner, names, report = hedged_fetch(candidates, hedge_delay=hedge_delay)
+    if names is None:
+        errs = "; ".join(f"{u}: {r['status']}" for u, r in report.items())
+        raise RuntimeError(f"所有镜像均失败：{errs}")
+    if winner:
+        print(f"[ok] base list from {winner} in {report[winner]['seconds']:.2f}s")
+    return names
 
 def collect_intrinsics(root_url: str, subdir: str):
     """
@@ -146,6 +228,10 @@ def collect_intrinsics(root_url: str, subdir: str):
 def main():
     p = argparse.ArgumentParser(description="LoongArch 指令名抓取（base / lsx / lasx）")
     p.add_argument("--base-url", default="https://docs.kernel.org/arch/loongarch/introduction.html")
+    p.add_argument("--mirror", action="append", default=[],
+                   help="额外的 base 候选镜像 URL（可多次；也支持 file://）")
+    p.add_argument("--hedge-delay", type=float, default=0.5,
+                   help="镜像错峰启动间隔（秒）；0 表示所有镜像同时起跑（默认 0.5）")
     p.add_argument("--lsx-root", default="https://jia.je/unofficial-loongarch-intrinsics-guide/")
     p.add_argument("--lasx-root", default="https://jia.je/unofficial-loongarch-intrinsics-guide/")
     p.add_argument("--out-base", default="loongarch_base")
@@ -156,7 +242,7 @@ def main():
     args = p.parse_args()
 
     if args.what in ("base","all"):
-        dump_names(collect_loongarch_base(args.base_url), args.out_base)
+        dump_names(collect_loongarch_base(args.base_url, args.mirror, args.hedge_delay), args.out_base)
     if args.what in ("lsx","all"):
         dump_names(collect_intrinsics(args.lsx_root, "lsx"), args.out_lsx)
     if args.what in ("lasx","all"):
@@ -10,7 +10,7 @@ loongarch_make_docs.py
 
 依赖：无（Python 标准库）
 """
-import argparse, re, shutil
+import argparse, json, re, shutil
 from pathlib import Path
 
 TEMPLATE = Path("template.md")
@@ -52,19 +52,31 @@ def write_one(dir_path: Path, instr_name: str, tpl: str):
     content = replace_last_codeblock(tpl, instr_name)
     (dir_path / fn).write_text(content, encoding="utf-8")
 
+def load_aliases(path: Path) -> dict[str, str]:
+    """读取 fold_aliases.py 生成的索引：{"<bucket>/<原始名>": "<bucket>/<主条目原始名>"}"""
+    return json.loads(path.read_text(encoding="utf-8")).get("aliases", {})
+
+def write_alias(dir_path: Path, instr_name: str, primary_ref: str):
+    # 非主条目只写一行指向主条目的记录，不生成完整 stub
+    p_ext, p_name = primary_ref.split("/", 1)
+    fn = norm_filename(instr_name) + ".alias.txt"
+    (dir_path / fn).write_text(f"{p_ext}/{norm_filename(p_name)}.ts\n", encoding="utf-8")
+
 def main():
     ap = argparse.ArgumentParser(description="按扩展生成 <指令名>.ts 文件（支持重写）")
     ap.add_argument("--bucket", action="append", required=True, metavar="EXT=FILE",
                     help="扩展=清单文件（可多次），例：loongarch=loongarch_base.txt")
     ap.add_argument("--out-root", default=".", help="输出根目录（默认当前目录）")
     ap.add_argument("--clean", action="store_true", help="生成前先删除对应 EXT 目录（重写）")
+    ap.add_argument("--aliases", help="fold_aliases.py 生成的别名索引；非主条目只写 .alias.txt")
     args = ap.parse_args()
 
     out_root = Path(args.out_root)
     out_root.mkdir(parents=True, exist_ok=True)
     tpl = load_template()
+    aliases = load_aliases(Path(args.aliases)) if args.aliases else {}
 
-    total = 0
+    total = folded = 0
     for spec in args.bucket:
         if "=" not in spec:
             raise ValueError(f"--bucket 格式错误：{spec}（应为 EXT=FILE）")
@@ -81,12 +93,17 @@ def main():
         out_dir.mkdir(parents=True, exist_ok=True)
 
         names = read_list(in_file)
+        n_alias = 0
         for n in names:
-            write_one(out_dir, n, tpl)
-            total += 1
-        print(f"[ok] {ext}: {len(names)} files -> {out_dir}")
+            primary = aliases.get(f"{ext}/{n}")
+            if primary:
+                write_alias(out_dir, n, primary); n_alias += 1
+            else:
+                write_one(out_dir, n, tpl); total += 1
+        folded += n_alias
+        print(f"[ok] {ext}: {len(names) - n_alias} files (+{n_alias} aliases) -> {out_dir}")
 
-    print(f"[done] total files: {total}")
+    print(f"[done] total files: {total}" + (f", aliases: {folded}" if aliases else ""))
 
 if __name__ == "__main__":
     main()
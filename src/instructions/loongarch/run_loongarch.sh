@@ -3,22 +3,10 @@ set -euo pipefail
 
 PY=${PY:-python3}
 
-# 1) 抓取（Base + LSX + LASX）
+# 1) 抓取（Base + LSX + LASX）；base 在脚本内对冲 docs.kernel.org 与 kernel.org 镜像
 $PY loongarch_instr_names.py --what base --out-base loongarch_base \
   --base-url "https://docs.kernel.org/arch/loongarch/introduction.html" || true
 
-# 回退尝试（若上一步失败）
-if [ ! -s loongarch_base.txt ]; then
-  echo "[info] retry base with kernel.org mirror (latest)"
-  $PY loongarch_instr_names.py --what base --out-base loongarch_base \
-    --base-url "https://www.kernel.org/doc/html/latest/arch/loongarch/introduction.html" || true
-fi
-if [ ! -s loongarch_base.txt ]; then
-  echo "[info] retry base with kernel.org mirror (v6.6)"
-  $PY loongarch_instr_names.py --what base --out-base loongarch_base \
-    --base-url "https://www.kernel.org/doc/html/v6.6/arch/loongarch/introduction.html" || true
-fi
-
 $PY loongarch_instr_names.py --what lsx  --out-lsx  loongarch_lsx
 $PY loongarch_instr_names.py --what lasx --out-lasx loongarch_lasx
 
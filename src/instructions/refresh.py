@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+refresh.py
+四个 ISA 的 抓取 -> 清单合并 -> 分 bucket 生成 -> 打包 全流程编排（替代 run_*.sh 串行脚本）：
+- 每一步是依赖图中的一个节点；互不依赖的节点并行执行（--jobs 限制并发）
+- 增量：节点的输入（清单/模板/脚本文件内容 + 命令行）哈希与上次成功时一致且输出仍在，则跳过
+- 抓取节点依赖网络、没有可哈希的输入，默认不执行（直接使用仓库里的清单）；加 --scrape 才执行
+- 结束时打印关键路径（按本次实际耗时的最长依赖链）与总耗时
+- 可选产物缓存（--cache-dir，见 artifact_cache.py）：生成节点按 (清单, 模板, 生成器, 选项) 的内容哈希
+  命中则直接解包而不渲染；整棵生成树另存一个归档，冷启动时一次解包即可得到全部 bucket
+
+生成结果写到 --out-root（默认 <repo>/build/refresh/<arch>/<bucket>），不会覆盖源码树中的模块；
+每个节点的输出日志在 <out-root>/logs/<节点名>.log，增量状态在 <out-root>/.refresh_state.json。
+
+依赖：无（Python 标准库）；抓取节点各自依赖见对应 *_instr_names.py
+
+示例：
+  python refresh.py --jobs 8                  # 全量（跳过未变化的节点）
+  python refresh.py --only riscv --only x86   # 只跑部分 ISA
+  python refresh.py --scrape --force          # 重新抓取并强制全部重跑
+  python refresh.py --dry-run                 # 只打印依赖图
+"""
+import argparse, hashlib, json, os, shutil, subprocess, sys, tarfile, time, zipfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+from artifact_cache import ArtifactCache, cache_key, parse_size
+
+HERE = Path(__file__).resolve().parent
+PY = sys.executable
+
+# DDI0602 各分区的“按字母序指令列表”页
+ARM_DDI0602 = "https://developer.arm.com/documentation/ddi0602/latest/"
+ARM_LISTS = [
+    # (bucket, 清单前缀, DDI0602 分区；None 表示无抓取来源，直接使用仓库清单)
+    ("armv7", "armv7_list", None),
+    ("armv8-base", "armv8_base", "Base-Instructions"),
+    ("armv8-simdfp", "armv8_simdfp", "SIMD-FP-Instructions"),
+    ("armv8-sve", "armv8_sve", "SVE-Instructions"),
+    ("armv9-sme", "armv9_sme", "SME-Instructions"),
+]
+LOONGARCH_LISTS = [
+    ("loongarch", "loongarch_base", "base"),
+    ("loongarch-lsx", "loongarch_lsx", "lsx"),
+    ("loongarch-lasx", "loongarch_lasx", "lasx"),
+]
+
+class Node:
+    def __init__(self, name, *, cmd=None, func=None, cwd=HERE, inputs=(), outputs=(),
+                 deps=(), scrape=False, artifact=None):
+        self.name = name
+        self.cmd = [str(c) for c in cmd] if cmd else None
+        self.func = func
+        self.cwd = Path(cwd)
+        self.inputs = [Path(p) for p in inputs]
+        self.outputs = [Path(p) for p in outputs]
+        self.deps = list(deps)
+        self.scrape = scrape
+        self.artifact = Path(artifact) if artifact else None   # 可缓存的输出目录（生成节点）
+        self.status = "pending"   # pending / running / ok / cached / skipped / failed / blocked
+        self.duration = 0.0
+
+    def fingerprint(self) -> str:
+        h = hashlib.sha256()
+        h.update(json.dumps(self.cmd or self.func.__name__).encode("utf-8"))
+        for p in self.inputs:
+            h.update(str(p).encode("utf-8"))
+            h.update(p.read_bytes() if p.exists() else b"<missing>")
+        return h.hexdigest()
+
+    def cache_key(self, out_root: Path) -> str:
+        # 输出路径因机器而异，不进入键；生成器脚本本身在 inputs 里，即“生成器版本”
+        opts = [c.replace(str(out_root), "<out>") for c in self.cmd]
+        return cache_key(self.name, *opts[1:], *self.inputs)
+
+# ---------- 进程内节点 ----------
+
+def merge_arm_lists(out_root: Path):
+    # 与 arm_instr_names.py 的排序一致：按 (大写, 原样)
+    names = set()
+    for _, prefix, _ in ARM_LISTS:
+        names |= {l.strip() for l in (HERE / "arm" / f"{prefix}.txt").read_text(encoding="utf-8").splitlines() if l.strip()}
+    out = sorted(names, key=lambda x: (x.upper(), x))
+    (HERE / "arm" / "arm_all_instructions.txt").write_text("".join(n + "\n" for n in out), encoding="utf-8")
+
+def make_packer(arch: str, buckets: list[str]):
+    def pack(out_root: Path):
+        zpath = out_root / f"{arch}_docs.zip"
+        tmp = zpath.with_suffix(".zip.tmp")
+        with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as z:
+            for b in buckets:
+                for f in sorted((out_root / arch / b).rglob("*")):
+                    if f.is_file():
+                        z.write(f, f.relative_to(out_root / arch).as_posix())
+        tmp.replace(zpath)
+    pack.__name__ = f"pack_{arch}"
+    return pack
+
+# ---------- 依赖图 ----------
+
+def build_graph(out_root: Path) -> dict[str, Node]:
+    nodes: dict[str, Node] = {}
+
+    def add(n: Node):
+        nodes[n.name] = n
+        return n
+
+    # RISC-V：riscv.txt 为人工维护的清单，无抓取步骤；gen_riscv.py 一次生成全部 bucket
+    rv_out = out_root / "riscv"
+    add(Node("generate:riscv", cmd=[PY, "gen_riscv.py", "--clean", "-t", "template.md", "-o", rv_out, "riscv.txt"],
+             cwd=HERE / "riscv",
+             inputs=[HERE / "riscv" / f for f in ("riscv.txt", "template.md", "gen_riscv.py")],
+             outputs=[rv_out], artifact=rv_out))
+    add(Node("pack:riscv", func=make_packer("riscv", ["."]), deps=["generate:riscv"],
+             inputs=[HERE / "riscv" / "riscv.txt", HERE / "riscv" / "template.md"],
+             outputs=[out_root / "riscv_docs.zip"]))
+
+    # ARM：各分区抓取 -> 合并 arm_all -> 分 bucket 生成 -> 打包
+    arm_dir = HERE / "arm"
+    for bucket, prefix, section in ARM_LISTS:
+        if section:
+            add(Node(f"scrape:{bucket}", scrape=True, cwd=arm_dir,
+                     cmd=[PY, "arm_instr_names.py", "--url", ARM_DDI0602 + section, "--out", prefix],
+                     inputs=[arm_dir / "arm_instr_names.py"], outputs=[arm_dir / f"{prefix}.txt"]))
+        add(Node(f"generate:{bucket}", cwd=arm_dir,
+                 cmd=[PY, "arm_make_docs.py", "--clean", "--out-root", out_root / "arm", "--bucket", f"{bucket}={prefix}.txt"],
+                 deps=[f"scrape:{bucket}"] if section else [],
+                 inputs=[arm_dir / f"{prefix}.txt", arm_dir / "template.md", arm_dir / "arm_make_docs.py"],
+                 outputs=[out_root / "arm" / bucket], artifact=out_root / "arm" / bucket))
+    add(Node("merge:arm-all", func=merge_arm_lists,
+             deps=[f"scrape:{b}" for b, _, s in ARM_LISTS if s],
+             inputs=[arm_dir / f"{p}.txt" for _, p, _ in ARM_LISTS],
+             outputs=[arm_dir / "arm_all_instructions.txt"]))
+    add(Node("pack:arm", func=make_packer("arm", [b for b, _, _ in ARM_LISTS]),
+             deps=[f"generate:{b}" for b, _, _ in ARM_LISTS],
+             inputs=[arm_dir / f"{p}.txt" for _, p, _ in ARM_LISTS] + [arm_dir / "template.md"],
+             outputs=[out_root / "arm_docs.zip"]))
+
+    # LoongArch：base/lsx/lasx 三路抓取 -> 分 bucket 生成 -> 打包
+    la_dir = HERE / "loongarch"
+    for bucket, prefix, what in LOONGARCH_LISTS:
+        add(Node(f"scrape:{bucket}", scrape=True, cwd=la_dir,
+                 cmd=[PY, "loongarch_instr_names.py", "--what", what, f"--out-{what}", prefix],
+                 inputs=[la_dir / "loongarch_instr_names.py"], outputs=[la_dir / f"{prefix}.txt"]))
+        add(Node(f"generate:{bucket}", cwd=la_dir,
+                 cmd=[PY, "loongarch_make_docs.py", "--clean", "--out-root", out_root / "loongarch",
+                      "--bucket", f"{bucket}={prefix}.txt"],
+                 deps=[f"scrape:{bucket}"],
+                 inputs=[la_dir / f"{prefix}.txt", la_dir / "template.md", la_dir / "loongarch_make_docs.py"],
+                 outputs=[out_root / "loongarch" / bucket], artifact=out_root / "loongarch" / bucket))
+    add(Node("pack:loongarch", func=make_packer("loongarch", [b for b, _, _ in LOONGARCH_LISTS]),
+             deps=[f"generate:{b}" for b, _, _ in LOONGARCH_LISTS],
+             inputs=[la_dir / f"{p}.txt" for _, p, _ in LOONGARCH_LISTS] + [la_dir / "template.md"],
+             outputs=[out_root / "loongarch_docs.zip"]))
+
+    # x86：Intel SDM 抓取 -> 生成 -> 打包
+    x86_dir = HERE / "x86"
+    add(Node("scrape:x86", scrape=True, cwd=x86_dir,
+             cmd=[PY, "x86_instr_names.py", "--mode", "intel", "--out", "x86_intel"],
+             inputs=[x86_dir / "x86_instr_names.py"], outputs=[x86_dir / "x86_intel.txt"]))
+    add(Node("generate:x86", cwd=x86_dir,
+             cmd=[PY, "x86_make_docs.py", "--clean", "--out-root", out_root / "x86", "--bucket", "x86=x86_intel.txt"],
+             deps=["scrape:x86"],
+             inputs=[x86_dir / "x86_intel.txt", x86_dir / "template.md", x86_dir / "x86_make_docs.py"],
+             outputs=[out_root / "x86" / "x86"], artifact=out_root / "x86" / "x86"))
+    add(Node("pack:x86", func=make_packer("x86", ["x86"]), deps=["generate:x86"],
+             inputs=[x86_dir / "x86_intel.txt", x86_dir / "template.md"],
+             outputs=[out_root / "x86_docs.zip"]))
+
+    # 跨 ISA：搜索索引依赖所有清单
+    list_nodes = [n for n in nodes if n.startswith("scrape:")] + ["merge:arm-all"]
+    add(Node("index:search", cmd=[PY, "build_search_index.py", "--out-dir", out_root / "search-index"],
+             deps=list_nodes,
+             inputs=[HERE / "build_search_index.py", HERE / "riscv" / "riscv.txt"]
+                    + [arm_dir / f"{p}.txt" for _, p, _ in ARM_LISTS]
+                    + [la_dir / f"{p}.txt" for _, p, _ in LOONGARCH_LISTS] + [x86_dir / "x86_intel.txt"],
+             outputs=[out_root / "search-index" / "manifest.json"]))
+    return nodes
+
+def arch_of(name: str) -> str:
+    tail = name.split(":", 1)[1]
+    for arch in ("riscv", "arm", "loongarch", "x86"):
+        if tail.startswith(arch):
+            return arch
+    return ""
+
+def select(nodes: dict[str, Node], only: list[str] | None) -> dict[str, Node]:
+    if not only:
+        return nodes
+    keep = {n for n in nodes if arch_of(n) in only}
+    for n in keep:   # 选中节点的依赖必须存在（被跳过的依赖视为已满足）
+        nodes[n].deps = [d for d in nodes[n].deps if d in keep]
+    return {n: nodes[n] for n in nodes if n in keep}
+
+# ---------- 执行 ----------
+
+def run_node(node: Node, out_root: Path, log_dir: Path, cache: ArtifactCache | None) -> str:
+    """执行节点，返回最终状态：ok（实际执行）或 cached（从产物缓存恢复）。"""
+    if node.func:
+        node.func(out_root)
+        return "ok"
+    key = node.cache_key(out_root) if cache and node.artifact else None
+    try:
+        if key and cache.get(key, node.artifact):
+            return "cached"
+    except (OSError, tarfile.TarError) as e:
+        print(f"[cache] get {node.name} failed, regenerating: {e}", file=sys.stderr)
+    if key and node.artifact.exists():
+        shutil.rmtree(node.artifact)   # 归档只能由键决定，不能带上之前运行残留的文件
+    with open(log_dir / (node.name.replace(":", "_") + ".log"), "w", encoding="utf-8") as log:
+        r = subprocess.run(node.cmd, cwd=node.cwd, stdout=log, stderr=subprocess.STDOUT)
+    if r.returncode != 0:
+        raise RuntimeError(f"exit {r.returncode}")
+    if key:
+        try:
+            cache.put(key, node.artifact)
+        except OSError as e:
+            # 缓存只是加速手段：共享挂载上写失败不能把已成功生成的节点判为失败
+            print(f"[cache] put {node.name} failed: {e}", file=sys.stderr)
+    return "ok"
+
+def tree_key(gen_nodes: list[Node], out_root: Path) -> str:
+    return cache_key("tree", *sorted(f"{n.name}={n.cache_key(out_root)}" for n in gen_nodes))
+
+def tree_paths(gen_nodes: list[Node], out_root: Path) -> list[str]:
+    return sorted(n.artifact.relative_to(out_root).as_posix() for n in gen_nodes)
+
+def critical_path(nodes: dict[str, Node]) -> tuple[float, list[str]]:
+    memo: dict[str, tuple[float, list[str]]] = {}
+
+    def longest(n: str):
+        if n not in memo:
+            best = max((longest(d) for d in nodes[n].deps), default=(0.0, []), key=lambda x: x[0])
+            memo[n] = (best[0] + nodes[n].duration, best[1] + [n])
+        return memo[n]
+    return max((longest(n) for n in nodes), default=(0.0, []), key=lambda x: x[0])
+
+def main():
+    ap = argparse.ArgumentParser(description="四 ISA 抓取/生成/打包 的并行增量编排")
+    ap.add_argument("--jobs", "-j", type=int, default=4, help="最大并行节点数（默认 4）")
+    ap.add_argument("--out-root", default=str(HERE.parent.parent / "build" / "refresh"),
+                    help="生成与打包输出目录（默认 build/refresh）")
+    ap.add_argument("--only", action="append", choices=["riscv", "arm", "loongarch", "x86"],
+                    help="只处理指定 ISA（可多次）")
+    ap.add_argument("--scrape", action="store_true", help="执行抓取节点（默认使用仓库里现有清单）")
+    ap.add_argument("--force", action="store_true", help="忽略增量状态，全部重跑")
+    ap.add_argument("--dry-run", action="store_true", help="只打印依赖图与将要执行的节点")
+    ap.add_argument("--cache-dir", default=os.environ.get("ISA_COSMOS_CACHE"),
+                    help="产物缓存目录（本地或共享挂载；默认取环境变量 ISA_COSMOS_CACHE，未设置则不缓存）")
+    ap.add_argument("--cache-max-size", default="2G", help="缓存大小上限，超出按 LRU 淘汰（默认 2G）")
+    args = ap.parse_args()
+
+    out_root = Path(args.out_root).resolve()
+    log_dir = out_root / "logs"
+    log_dir.mkdir(parents=True, exist_ok=True)
+    state_path = out_root / ".refresh_state.json"
+    state = json.loads(state_path.read_text(encoding="utf-8")) if state_path.exists() and not args.force else {}
+
+    nodes = select(build_graph(out_root), args.only)
+    if not args.scrape:
+        for n in nodes.values():
+            if n.scrape:
+                n.status = "skipped"
+
+    if args.dry_run:
+        for n in nodes.values():
+            deps = ", ".join(n.deps) or "-"
+            print(f"{n.name:<24} <- {deps}" + ("  [scrape: skipped]" if n.status == "skipped" else ""))
+        return
+
+    def up_to_date(n: Node) -> bool:
+        return state.get(n.name) == n.fingerprint() and all(p.exists() for p in n.outputs)
+
+    t_start = time.monotonic()
+    cache = ArtifactCache(args.cache_dir, parse_size(args.cache_max_size)) if args.cache_dir else None
+    gen_nodes = [n for n in nodes.values() if n.artifact]
+    tkey = None
+    if cache and gen_nodes and not args.scrape:
+        # 整树归档：清单不会在本次运行中变化时才能预先算键；命中则一次解包得到所有 bucket。
+        # 全部生成节点都已是最新时不解包（否则每次运行都会删掉并重写整棵树）
+        tkey = tree_key(gen_nodes, out_root)
+        stale = args.force or not all(up_to_date(n) for n in gen_nodes)
+        try:
+            restored = stale and cache.get(tkey, out_root, paths=tree_paths(gen_nodes, out_root))
+        except (OSError, tarfile.TarError) as e:
+            # 解包到一半失败时各 bucket 目录已被清空：全部按过期处理，重新生成
+            print(f"[cache] tree restore failed, regenerating: {e}", file=sys.stderr)
+            restored = False
+            for n in gen_nodes:
+                state.pop(n.name, None)
+        if restored:
+            for n in gen_nodes:
+                n.status = "cached"
+                state[n.name] = n.fingerprint()
+            print(f"[cache] restored {len(gen_nodes)} generated buckets from one tree archive")
+
+    def schedule(pool, running) -> bool:
+        """把就绪节点提交执行或判定跳过；有状态变化返回 True。"""
+        changed = False
+        for n in nodes.values():
+            if n.status != "pending":
+                continue
+            dep_status = [nodes[d].status for d in n.deps]
+            if any(s in ("failed", "blocked") for s in dep_status):
+                n.status = "blocked"; changed = True
+                print(f"[blocked] {n.name}")
+                continue
+            if not all(s in ("ok", "cached", "skipped") for s in dep_status):
+                continue
+            # 上游本次真正执行过则必须重跑；否则比较输入指纹（清单可能刚被上游改写，所以此时才算）
+            if not args.force and "ok" not in dep_status and up_to_date(n):
+                n.status = "skipped"; changed = True
+                print(f"[skip] {n.name} (unchanged)")
+                continue
+            if len(running) < args.jobs:
+                n.status = "running"; changed = True
+                running[pool.submit(lambda n=n: (time.monotonic(), run_node(n, out_root, log_dir, cache)))] = n
+        return changed
+
+    running = {}
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        while True:
+            while schedule(pool, running):
+                pass
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                n = running.pop(fut)
+                try:
+                    t0, status = fut.result()
+                    n.duration = time.monotonic() - t0
+                    n.status = status
+                    state[n.name] = n.fingerprint()
+                    state_path.write_text(json.dumps(state, indent=1), encoding="utf-8")
+                    print(f"[{'cache' if status == 'cached' else 'ok'}] {n.name} ({n.duration:.1f}s)")
+                except Exception as e:
+                    n.status = "failed"
+                    print(f"[fail] {n.name}: {e} (see {log_dir})", file=sys.stderr)
+    wall = time.monotonic() - t_start
+    state_path.write_text(json.dumps(state, indent=1), encoding="utf-8")
+
+    if tkey and any(n.status == "ok" for n in gen_nodes) \
+            and all(n.status in ("ok", "cached", "skipped") for n in gen_nodes) \
+            and all(n.artifact.exists() for n in gen_nodes):
+        try:
+            cache.put(tkey, out_root, paths=tree_paths(gen_nodes, out_root))
+        except OSError as e:
+            print(f"[cache] put tree archive failed: {e}", file=sys.stderr)
+    if cache:
+        print(f"[cache] hits={cache.hits} misses={cache.misses} dir={cache.root}")
+
+    counts = {}
+    for n in nodes.values():
+        counts[n.status] = counts.get(n.status, 0) + 1
+    serial = sum(n.duration for n in nodes.values())
+    cp_len, cp = critical_path(nodes)
+    print(f"[done] {counts} wall={wall:.1f}s (serial would be {serial:.1f}s)")
+    print(f"[critical path] {cp_len:.1f}s: " + " -> ".join(f"{n}({nodes[n].duration:.1f}s)" for n in cp))
+    sys.exit(1 if counts.get("failed") or counts.get("blocked") else 0)
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
-import type { InstructionModule, InstructionMeta, InstructionSetValidator, InstructionInfoProvider } from './types'
+import type { InstructionModule, InstructionMeta, InstructionSetValidator, InstructionInfoProvider, ValidationError } from './types'
+import { tr } from '@/i18n'
 
 // 自动加载本目录下所有 .ts（包含模块与校验器）
 const modules = (import.meta as any).glob('./**/*.ts', { eager: true }) as Record<string, any>
@@ -6,7 +7,27 @@ const modules = (import.meta as any).glob('./**/*.ts', { eager: true }) as Recor
 export const instructionRegistry: Record<string, InstructionModule> = {}
 export const infoRegistry: Record<string, InstructionInfoProvider> = {}
 export const miniDocs: Record<string, InstructionMeta> = {}
-const validators: InstructionSetValidator[] = []
+// 按 arch 预先分组，校验时直接取，不再每次 filter 全部校验器
+const validatorsByArch = new Map<string, InstructionSetValidator[]>()
+
+// 构建期生成的 opcode 表（python build_opcode_tables.py -> ./opcodes/<arch>.json）
+// ops: opcode(小写) -> [允许的 form 列表, exts 下标列表]
+// complete：清单已核对完整（目前只有 riscv）才据此拦截；其余架构的清单缺指令，表只供 lookupOpcode 查询
+export interface OpcodeTable {
+  version: number
+  arch: string
+  hash: string
+  complete?: boolean
+  exts: string[]
+  ops: Record<string, [string[], number[]]>
+}
+const opcodeTables: Record<string, OpcodeTable> = {}
+const hasOwn = (o: object, k: string) => Object.prototype.hasOwnProperty.call(o, k)
+const tableModules = (import.meta as any).glob('./opcodes/*.json', { eager: true, import: 'default' }) as Record<string, OpcodeTable>
+for (const p in tableModules) {
+  const t = tableModules[p]
+  if (t && typeof t.arch === 'string' && t.ops) opcodeTables[t.arch] = t
+}
 
 export interface CatalogItem {
   id: string            // 完整 id，例如 'riscv/v/vadd.vv' 或 'rvv/vadd.vv'
@@ -73,20 +94,67 @@ for (const p in modules) {
         defineMiniDocGetter(c.id.replace('/', '.'), c.metaGetter as any)
       }
     } else if (isValidator(c)) {
-      validators.push(c)
+      const list = validatorsByArch.get(c.arch)
+      if (list) list.push(c)
+      else validatorsByArch.set(c.arch, [c])
     }
   }
 }
 
+// 已注册模块的 opcode（按归一化 arch）：抓取的清单并不完整（如 arm 缺 add/ldr，x86 缺 jz/cmovz），
+// 有模块的指令永远不能被 opcode 表拦下
+const moduleOpcodes = new Map<string, Set<string>>()
+for (const meta of moduleMetas) {
+  const opcode = parseOpcodeForm(meta.mod.id).opcode.toLowerCase()
+  const idArch = meta.mod.id.includes('/') ? meta.mod.id.split('/')[0] : ''
+  for (const a of new Set([normalizeArch(detectArchExt(meta.path, meta.mod.id).arch), normalizeArch(idArch)])) {
+    const set = moduleOpcodes.get(a)
+    if (set) set.add(opcode)
+    else moduleOpcodes.set(a, new Set([opcode]))
+  }
+}
+
 export const getInstrModule = (k: string) => instructionRegistry[k]
 export const getInstrInfo = (k: string) => infoRegistry[k]
 
-// 供 LeftPanel 调用：按 arch 找到对应校验器并汇总错误
-export function validateWithRegistry(ast: { arch: string; opcode: string; form: string; operands: string[] }) {
-  const errs = validators.filter(v => v.arch === ast.arch).flatMap(v => v.validate(ast))
+// 查 opcode 表：返回允许的 form 与所属扩展；表不存在返回 null，opcode 未知返回 undefined
+export function lookupOpcode(arch: string, opcode: string): { forms: string[]; exts: string[] } | null | undefined {
+  const table = opcodeTables[normalizeArch(arch)]
+  if (!table) return null
+  const op = opcode.toLowerCase()
+  if (!hasOwn(table.ops, op)) return undefined
+  const hit = table.ops[op]
+  return { forms: hit[0], exts: hit[1].map(i => table.exts[i]) }
+}
+
+// opcode 是否可接受：在 opcode 表中，或有已注册模块；该架构没有表或表不完整时一律接受
+function isKnownOpcode(arch: string, opcode: string): boolean {
+  const a = normalizeArch(arch)
+  const table = opcodeTables[a]
+  const op = opcode.toLowerCase()
+  return !table?.complete || hasOwn(table.ops, op) || !!moduleOpcodes.get(a)?.has(op)
+}
+
+// 供 LeftPanel 调用：先查 opcode 表拒绝未知指令，再按 arch 找到对应校验器并汇总错误
+export function validateWithRegistry(ast: { arch: string; opcode: string; form: string; operands: string[] }): ValidationError[] {
+  if (!isKnownOpcode(ast.arch, ast.opcode)) {
+    // 与 LeftPanel 找不到模块时的提示同一措辞
+    const name = ast.form ? `${ast.opcode}.${ast.form}` : ast.opcode
+    return [{ col: 1, message: tr('非法指令或还未受支持：', 'Unsupported or invalid instruction: ') + name }]
+  }
+  const errs = (validatorsByArch.get(ast.arch) || []).flatMap(v => v.validate(ast))
   return errs
 }
 
+// 开发环境自检：每个已注册模块的 opcode 都必须能通过上面的检查
+if ((import.meta as any).env?.DEV) {
+  for (const meta of moduleMetas) {
+    const { arch } = detectArchExt(meta.path, meta.mod.id)
+    const { opcode } = parseOpcodeForm(meta.mod.id)
+    if (!isKnownOpcode(arch, opcode)) console.error(`[registry] opcode gate rejects registered module ${meta.mod.id}`)
+  }
+}
+
 // ===== 新增：目录分组逻辑 =====
 
 // 归一化架构：把 rvv / riscv* 统一成 'riscv'；arm* 统一成 'arm'
@@ -2,8 +2,10 @@
 # -*- coding: utf-8 -*-
 
 import argparse
+import json
 import os
 import re
+import shutil
 import sys
 from pathlib import Path
 from typing import Iterable, Tuple, Dict, Set
@@ -21,11 +23,20 @@ def parse_args():
     p.add_argument(
         "-o", "--outdir", default="riscv_out", help="Root output directory (default: riscv_out)."
     )
+    p.add_argument(
+        "--clean",
+        action="store_true",
+        help="Remove each bucket directory (e.g. riscv_v) before generating into it, so mnemonics dropped from the input leave no stale files. The output root itself is never removed.",
+    )
     p.add_argument(
         "--include-vendor",
         action="store_true",
         help="Include vendor-specific classes (INSN_CLASS_X*). Default is to exclude.",
     )
+    p.add_argument(
+        "--aliases",
+        help="Alias index produced by fold_aliases.py; non-primary entries get a one-line .alias.txt instead of a full file.",
+    )
     p.add_argument(
         "input",
         nargs="?",
@@ -91,6 +102,15 @@ def fill_template_last_code_fence(template_text: str, mnemonic: str) -> str:
         block = f"```\n{mnemonic}\n```\n"
         return template_text + suffix + block
 
+def mnemonic_to_filename(mnemonic: str) -> str:
+    return mnemonic.replace(".", "_")  # vadd.vv -> vadd_vv
+
+def load_aliases(path: Path) -> Dict[str, str]:
+    """
+    读取 fold_aliases.py 生成的索引：{"<bucket>/<mnemonic>": "<bucket>/<主条目 mnemonic>"}
+    """
+    return json.loads(path.read_text(encoding="utf-8")).get("aliases", {})
+
 def main():
     args = parse_args()
     tpl_path = Path(args.template)
@@ -109,12 +129,18 @@ def main():
     else:
         in_lines = sys.stdin.read().splitlines()
 
+    aliases = load_aliases(Path(args.aliases)) if args.aliases else {}
+    alias_counts: Dict[str, int] = {}
+
     # 去重：按 (bucket, filename) 去重
     seen: Set[Tuple[str, str]] = set()
 
     # 统计（可选）
     counts: Dict[str, int] = {}
 
+    # --clean：每个 bucket 第一次出现时清空其目录（与 *_make_docs.py 一致，只删 bucket，不删输出根）
+    cleaned: Set[str] = set()
+
     for insn_class, mnemonic in iter_pairs(in_lines):
         # 过滤厂商类（INSN_CLASS_X...）
         if not args.include_vendor and insn_class.startswith("INSN_CLASS_X"):
@@ -122,14 +148,27 @@ def main():
 
         bucket = class_to_bucket(insn_class)
         out_dir = out_root / bucket
+        if args.clean and bucket not in cleaned:
+            cleaned.add(bucket)
+            if out_dir.exists():
+                shutil.rmtree(out_dir)
         out_dir.mkdir(parents=True, exist_ok=True)
 
-        filename = mnemonic.replace(".", "_") + ".ts"  # vadd.vv -> vadd_vv.ts
+        filename = mnemonic_to_filename(mnemonic) + ".ts"  # vadd.vv -> vadd_vv.ts
         key = (bucket, filename)
         if key in seen:
             continue
         seen.add(key)
 
+        # 别名折叠：非主条目只写一行指向主条目的记录
+        primary = aliases.get(f"{bucket}/{mnemonic}")
+        if primary:
+            p_bucket, p_mnem = primary.split("/", 1)
+            alias_file = out_dir / (mnemonic_to_filename(mnemonic) + ".alias.txt")
+            alias_file.write_text(f"{p_bucket}/{mnemonic_to_filename(p_mnem)}.ts\n", encoding="utf-8")
+            alias_counts[bucket] = alias_counts.get(bucket, 0) + 1
+            continue
+
         # 生成文件内容：模板的最后一个 ``` 代码块里填入原始助记符（带点）
         content = fill_template_last_code_fence(template_text, mnemonic)
 
@@ -139,10 +178,13 @@ def main():
 
     # 简要统计输出
     print(f"Done. Output root: {out_root}")
-    if counts:
-        width = max(len(k) for k in counts)
-        for k in sorted(counts):
-            print(f"{k.ljust(width)} : {counts[k]}")
+    # 全部条目都是别名的 bucket 不在 counts 里，也要列出
+    buckets = sorted(counts.keys() | alias_counts.keys())
+    if buckets:
+        width = max(len(k) for k in buckets)
+        for k in buckets:
+            extra = f" (+{alias_counts[k]} aliases)" if k in alias_counts else ""
+            print(f"{k.ljust(width)} : {counts.get(k, 0)}{extra}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+stub_server.py
+常驻的本地 stub 渲染服务：不再预先落盘 ~5500 个 *.ts.txt，开发服务器按需请求即可。
+- 启动时读入各架构清单与 template.md，把模板“编译”为 (head, tail) 两段：
+  渲染 = head + 原始指令名 + tail，与 *_make_docs.py 的 replace_last_codeblock /
+  gen_riscv.py 的 fill_template_last_code_fence 输出逐字节一致
+- 文件名规则同生成器：norm_filename（arm/loongarch/x86），'.' -> '_'（riscv）
+- 渲染结果放进 LRU（--lru 条）；清单或模板文件变化时（按 mtime 检查，最多每 --reload-interval 秒一次）
+  自动重新加载并清空 LRU
+- 计数：命中/未命中/404/重载次数与渲染延迟分位数
+
+接口（仅监听本机）：
+  GET /instructions/<arch>/<bucket>/<name>[.ts.txt]   -> stub 文本（text/plain）
+  GET /instructions/<arch>/<bucket>/                   -> 该 bucket 的文件名列表（JSON）
+  GET /stats                                           -> 计数器（JSON）
+
+Vite 开发服务器可用 server.proxy 把 /instructions 转发到这里。
+
+依赖：无（Python 标准库）
+
+示例：
+  python stub_server.py --port 8787
+  curl http://127.0.0.1:8787/instructions/riscv/riscv_v/vadd_vv
+"""
+import argparse, json, re, threading, time
+from collections import OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import unquote
+
+from build_search_index import DEFAULT_BUCKETS, DEFAULT_RISCV, HERE, read_list, read_riscv
+
+STUB_SUFFIX = ".ts.txt"
+
+def norm_filename(name: str) -> str:
+    s = name.lower()
+    s = re.sub(r"[^a-z0-9]+", "-", s)
+    s = re.sub(r"-{2,}", "-", s).strip("-")
+    return s or "instr"
+
+def riscv_filename(mnemonic: str) -> str:
+    return mnemonic.replace(".", "_")  # vadd.vv -> vadd_vv
+
+def compile_codeblock(md: str) -> tuple[str, str]:
+    """replace_last_codeblock(md, x) == head + x + tail"""
+    fence = "```"
+    idxs = [m.start() for m in re.finditer(re.escape(fence), md)]
+    if len(idxs) < 2:
+        return md.rstrip() + "\n\n```\n", "\n```\n"
+    start, end = idxs[-2], idxs[-1]
+    nl = md.find("\n", start)
+    if nl == -1 or nl >= end:
+        return md[:start] + "```\n", "\n```" + md[end + len(fence):]
+    return md[:nl + 1], md[end:]
+
+def compile_fence_lines(template_text: str) -> tuple[str, str]:
+    """gen_riscv.fill_template_last_code_fence(t, x) == head + x + tail"""
+    lines = template_text.splitlines()
+    fence_idxs = [i for i, ln in enumerate(lines) if ln.strip() == "```"]
+    trailing = "\n" if template_text.endswith("\n") else ""
+    if len(fence_idxs) >= 2:
+        start, end = fence_idxs[-2], fence_idxs[-1]
+        return "\n".join(lines[:start + 1]) + "\n", "\n" + "\n".join(lines[end:]) + trailing
+    suffix = "\n" if (len(lines) > 0 and not template_text.endswith("\n")) else ""
+    return template_text + suffix + "```\n", "\n```\n"
+
+class Catalog:
+    """(arch, bucket, 文件名) -> 原始指令名，外加每个架构编译好的模板。"""
+    def __init__(self, root: Path):
+        self.root = root
+        self.sources: list[Path] = []
+        self.names: dict[tuple[str, str, str], str] = {}
+        self.templates: dict[str, tuple[str, str]] = {}
+        self.load()
+
+    def load(self):
+        names, sources = {}, []
+        for arch, bucket, rel in DEFAULT_BUCKETS:
+            path = self.root / rel
+            sources.append(path)
+            for n in read_list(path):
+                names.setdefault((arch, bucket, norm_filename(n)), n)
+        rv = self.root / DEFAULT_RISCV
+        sources.append(rv)
+        for bucket, m in read_riscv(rv):
+            names.setdefault(("riscv", bucket, riscv_filename(m)), m)
+        templates = {}
+        for arch in {a for a, _, _ in names}:
+            tpl = self.root / arch / "template.md"
+            sources.append(tpl)
+            text = tpl.read_text(encoding="utf-8")
+            templates[arch] = compile_fence_lines(text) if arch == "riscv" else compile_codeblock(text)
+        self.names, self.templates, self.sources = names, templates, sources
+        self.stamp = self.current_stamp()
+
+    def current_stamp(self):
+        return tuple(p.stat().st_mtime_ns if p.exists() else 0 for p in self.sources)
+
+    def render(self, arch: str, bucket: str, fn: str) -> str | None:
+        name = self.names.get((arch, bucket, fn))
+        if name is None:
+            return None
+        head, tail = self.templates[arch]
+        return head + name + tail
+
+    def list_bucket(self, arch: str, bucket: str) -> list[str]:
+        return sorted(f for a, b, f in self.names if a == arch and b == bucket)
+
+class StubService:
+    def __init__(self, root: Path, lru_size: int, reload_interval: float):
+        self.catalog = Catalog(root)
+        self.lru: OrderedDict[tuple[str, str, str], str] = OrderedDict()
+        self.lru_size = lru_size
+        self.reload_interval = reload_interval
+        self.last_check = time.monotonic()
+        self.lock = threading.Lock()
+        self.latencies = deque(maxlen=4096)   # 最近若干次渲染耗时（微秒）
+        self.counters = {"requests": 0, "hits": 0, "misses": 0, "not_found": 0, "reloads": 0}
+
+    def maybe_reload(self):
+        now = time.monotonic()
+        if now - self.last_check < self.reload_interval:
+            return
+        self.last_check = now
+        if self.catalog.current_stamp() != self.catalog.stamp:
+            self.catalog.load()
+            self.lru.clear()
+            self.counters["reloads"] += 1
+            print(f"[reload] {len(self.catalog.names)} names")
+
+    def get(self, arch: str, bucket: str, fn: str) -> str | None:
+        t0 = time.perf_counter()
+        with self.lock:
+            self.maybe_reload()
+            self.counters["requests"] += 1
+            key = (arch, bucket, fn)
+            text = self.lru.get(key)
+            if text is not None:
+                self.lru.move_to_end(key)
+                self.counters["hits"] += 1
+            else:
+                text = self.catalog.render(arch, bucket, fn)
+                if text is None:
+                    self.counters["not_found"] += 1
+                else:
+                    self.counters["misses"] += 1
+                    self.lru[key] = text
+                    if len(self.lru) > self.lru_size:
+                        self.lru.popitem(last=False)
+            self.latencies.append((time.perf_counter() - t0) * 1e6)
+        return text
+
+    def stats(self) -> dict:
+        with self.lock:
+            lat = sorted(self.latencies)
+            pct = lambda p: round(lat[min(len(lat) - 1, int(len(lat) * p / 100))], 1) if lat else 0.0
+            return {**self.counters, "lru_entries": len(self.lru), "names": len(self.catalog.names),
+                    "latency_us": {"p50": pct(50), "p90": pct(90), "p99": pct(99)}}
+
+def make_handler(service: StubService):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, code: int, body: str, ctype: str):
+            raw = body.encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", f"{ctype}; charset=utf-8")
+            self.send_header("Content-Length", str(len(raw)))
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def do_GET(self):
+            path = unquote(self.path.split("?", 1)[0])
+            if path == "/stats":
+                return self._send(200, json.dumps(service.stats()), "application/json")
+            parts = path.strip("/").split("/")
+            if len(parts) == 3 and parts[0] == "instructions" and path.endswith("/"):
+                return self._send(200, json.dumps(service.catalog.list_bucket(parts[1], parts[2])),
+                                  "application/json")
+            if len(parts) != 4 or parts[0] != "instructions":
+                return self._send(404, "not found\n", "text/plain")
+            _, arch, bucket, fn = parts
+            for suf in (STUB_SUFFIX, ".ts"):
+                if fn.endswith(suf):
+                    fn = fn[: -len(suf)]
+                    break
+            text = service.get(arch, bucket, fn)
+            if text is None:
+                return self._send(404, f"unknown instruction: {arch}/{bucket}/{fn}\n", "text/plain")
+            self._send(200, text, "text/plain")
+
+        def log_message(self, fmt, *args):
+            pass  # 每请求一行日志会比渲染本身慢得多；看 /stats
+
+    return Handler
+
+def main():
+    ap = argparse.ArgumentParser(description="按需渲染指令 stub 的本地常驻服务")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8787)
+    ap.add_argument("--root", default=str(HERE), help="指令根目录（默认本脚本所在目录）")
+    ap.add_argument("--lru", type=int, default=1024, help="渲染结果 LRU 容量（默认 1024）")
+    ap.add_argument("--reload-interval", type=float, default=1.0, help="检查清单/模板变化的最小间隔（秒）")
+    args = ap.parse_args()
+
+    service = StubService(Path(args.root), args.lru, args.reload_interval)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service))
+    print(f"[ok] {len(service.catalog.names)} names; listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+test_gen_modules.py
+gen_modules.py 对着本机替身 HTTP 服务跑：注入 429/500 检查重试，检查日志续跑、已有模块跳过、写盘失败不中断。
+
+运行：python -m unittest test_gen_modules（在 src/instructions 下）或 python -m pytest src/instructions
+依赖：无（Python 标准库）
+"""
+import argparse, asyncio, json, tempfile, threading, unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+
+import gen_modules
+
+class StandIn:
+    """OpenAI 兼容端点的替身：script[提示词] 是依次返回的 (状态码, 额外头)，用完后一律 200。"""
+    def __init__(self):
+        self.script: dict[str, list[tuple[int, dict]]] = {}
+        self.requests: list[str] = []
+        self.lock = threading.Lock()
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                prompt = body["messages"][0]["content"]
+                with stand_in.lock:
+                    stand_in.requests.append(prompt)
+                    queue = stand_in.script.get(prompt) or []
+                    code, headers = queue.pop(0) if queue else (200, {})
+                raw = json.dumps({"choices": [{"message": {"content": f"```ts\n// {prompt}\n```"}}]}).encode()
+                self.send_response(code)
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def log_message(self, fmt, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def endpoint(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}/v1/chat/completions"
+
+class GenModulesTest(unittest.TestCase):
+    def setUp(self):
+        self.stand_in = StandIn()
+        self.stand_in.thread.start()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        (self.root / "riscv").mkdir()
+        for name in ("add", "sub", "mul"):
+            (self.root / "riscv" / f"{name}.ts.txt").write_text(name, encoding="utf-8")
+        self.journal = self.root / "journal.jsonl"
+
+    def tearDown(self):
+        self.stand_in.server.shutdown()
+        self.stand_in.server.server_close()
+        self.tmp.cleanup()
+
+    def run_once(self, retries: int = 3) -> int:
+        args = argparse.Namespace(
+            root=str(self.root), arch=None, endpoint=self.stand_in.endpoint, model="m",
+            api_key_env="GEN_MODULES_TEST_KEY", concurrency=4, rps=0, burst=1, retries=retries,
+            backoff=0.01, timeout=5, journal=str(self.journal), limit=0, progress_every=100)
+        return asyncio.run(gen_modules.run(args))
+
+    def records(self) -> list[dict]:
+        return [json.loads(l) for l in self.journal.read_text(encoding="utf-8").splitlines()]
+
+    def test_retries_then_writes_module(self):
+        self.stand_in.script["add"] = [(429, {"Retry-After": "0"}), (500, {})]
+        self.assertEqual(self.run_once(), 0)
+        self.assertEqual(self.stand_in.requests.count("add"), 3)
+        self.assertEqual((self.root / "riscv" / "add.ts").read_text(encoding="utf-8"), "// add\n")
+        rec = next(r for r in self.records() if r["stub"] == "riscv/add.ts.txt")
+        self.assertEqual((rec["status"], rec["attempts"]), ("ok", 3))
+
+    def test_skips_existing_module(self):
+        (self.root / "riscv" / "mul.ts").write_text("// hand-written\n", encoding="utf-8")
+        self.assertEqual(self.run_once(), 0)
+        self.assertNotIn("mul", self.stand_in.requests)
+        self.assertEqual((self.root / "riscv" / "mul.ts").read_text(encoding="utf-8"), "// hand-written\n")
+
+    def test_journal_resume(self):
+        self.stand_in.script["sub"] = [(500, {})] * 2
+        self.assertEqual(self.run_once(retries=1), 1)   # sub 两次 500 用完重试 -> 失败
+        self.assertFalse((self.root / "riscv" / "sub.ts").exists())
+        (self.root / "riscv" / "add.ts").unlink()        # 日志里已成功：续跑时不应重新请求
+        self.stand_in.requests.clear()
+        self.assertEqual(self.run_once(retries=1), 0)
+        self.assertEqual(self.stand_in.requests, ["sub"])
+        self.assertTrue((self.root / "riscv" / "sub.ts").exists())
+
+    def test_write_failure_is_journaled(self):
+        real = gen_modules.write_atomic
+
+        def failing(dst, content):
+            if dst.name == "add.ts":
+                raise OSError(28, "No space left on device")
+            real(dst, content)
+
+        with mock.patch.object(gen_modules, "write_atomic", failing):
+            self.assertEqual(self.run_once(), 1)
+        status = {r["stub"]: r["status"] for r in self.records()}
+        self.assertEqual(status, {"riscv/add.ts.txt": "fail", "riscv/sub.ts.txt": "ok", "riscv/mul.ts.txt": "ok"})
+
+if __name__ == "__main__":
+    unittest.main()
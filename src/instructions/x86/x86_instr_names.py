@@ -8,15 +8,21 @@ x86_instr_names.py
 
 输出：<out>.txt（每行一个指令名）与 <out>.csv（第一列 name）
 
+内存：远程 PDF 分块流式写入临时文件（同时增量计算 sha256），本地/临时文件用 mmap 打开，
+pdfminer 逐页按需读取并逐页匹配；峰值内存与 PDF 体积基本无关。
+
 依赖：requests, pdfminer.six
 pip install requests pdfminer.six
 """
-import argparse, io, os, re, csv
+import argparse, contextlib, hashlib, io, mmap, os, re, csv, tempfile
 from urllib.parse import urlparse
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
-from pdfminer.high_level import extract_text
+from pdfminer.converter import TextConverter
+from pdfminer.layout import LAParams
+from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+from pdfminer.pdfpage import PDFPage
 
 UA = {"User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 Safari/537.36"}
 
@@ -29,17 +35,45 @@ def make_session():
     s.headers.update(UA)
     return s
 
-def fetch_bytes(url, timeout=120):
-    # 支持 file://path.pdf
+CHUNK = 1 << 20  # 下载分块：1 MiB
+
+def download_to_temp(url, timeout=120):
+    """流式下载到临时文件，边写边算 sha256；返回临时文件路径（调用方负责删除）。"""
+    s = make_session()
+    h, size = hashlib.sha256(), 0
+    fd, tmp = tempfile.mkstemp(prefix="x86_pdf_", suffix=".pdf")
+    try:
+        with s.get(url, timeout=timeout, allow_redirects=True, stream=True) as r, os.fdopen(fd, "wb") as f:
+            r.raise_for_status()
+            for chunk in r.iter_content(chunk_size=CHUNK):
+                if not chunk:
+                    continue
+                f.write(chunk); h.update(chunk); size += len(chunk)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    print(f"[fetch] {size / 2**20:.1f} MiB sha256={h.hexdigest()}")
+    return tmp
+
+@contextlib.contextmanager
+def open_pdf(url, timeout=120):
+    """
+    打开 PDF，产出一个只读 mmap（可 seek/read 的类文件对象）：
+    - file://path.pdf 直接 mmap 本地文件
+    - http(s) 先流式落盘到临时文件再 mmap，用完删除
+    """
+    tmp = None
     if url.startswith("file://"):
         p = urlparse(url)
         path = os.path.abspath(os.path.join(p.netloc, p.path))
-        with open(path, "rb") as f:
-            return f.read()
-    s = make_session()
-    r = s.get(url, timeout=timeout, allow_redirects=True)
-    r.raise_for_status()
-    return r.content
+    else:
+        path = tmp = download_to_temp(url, timeout=timeout)
+    try:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+    finally:
+        if tmp:
+            os.unlink(tmp)
 
 def dump_names(names, out_prefix):
     # 去重保序
@@ -57,22 +91,40 @@ def dump_names(names, out_prefix):
         for n in ordered: w.writerow([n])
     print(f"[ok] {out_prefix}: {len(ordered)} names -> {out_prefix}.txt / {out_prefix}.csv")
 
-def parse_pdf_for_mnemonics(pdf_bytes: bytes):
+def iter_page_texts(fp):
+    """
+    逐页抽取文本（与 extract_text 相同的 LAParams），每页处理完即清空缓冲。
+    caching=False：默认会把解析过的每个对象（含各页解码后的内容流）留在 PDFDocument 里，
+    峰值内存随 PDF 页数增长。
+    """
+    rsrc = PDFResourceManager()
+    buf = io.StringIO()
+    device = TextConverter(rsrc, buf, laparams=LAParams())
+    interp = PDFPageInterpreter(rsrc, device)
+    try:
+        for page in PDFPage.get_pages(fp, caching=False):
+            interp.process_page(page)
+            yield buf.getvalue()
+            buf.seek(0); buf.truncate()
+    finally:
+        device.close()
+
+def parse_pdf_for_mnemonics(fp):
     """
-    从 SDM/APM PDF 文本中提取标题行里的指令名。
+    从 SDM/APM PDF 文本中提取标题行里的指令名（fp：可 seek 的类文件对象，如 mmap）。
     典型格式：ADD — Add / VADDPD — Add Packed Double-Precision Floating-Point Values
     兼容分隔符：hyphen-minus(-), en/em dash(– —)
     """
-    text = extract_text(io.BytesIO(pdf_bytes)) or ""
     names = []
     dash = r"[\-–—]"  # -, en dash, em dash
     # 允许 . + / _ 等，处理 3DNow!/SSE 扩展类（如 PFRCP, SHA1RNDS4, VPCMPGTQ, VPTERNLOGD）
     pat = re.compile(rf"^([A-Z]{{2,}}[A-Z0-9\.\+/_-]*)\s+{dash}\s+", re.MULTILINE)
-    for m in pat.finditer(text):
-        cand = m.group(1).strip().rstrip('/')
-        # 排除明显非助记符（例如章节抬头 ALL/INDEX 等，这里要求至少含两位字母且全大写）
-        if cand and cand.upper() == cand and len(re.sub(r'[^A-Z]', '', cand)) >= 2:
-            names.append(cand)
+    for text in iter_page_texts(fp):
+        for m in pat.finditer(text):
+            cand = m.group(1).strip().rstrip('/')
+            # 排除明显非助记符（例如章节抬头 ALL/INDEX 等，这里要求至少含两位字母且全大写）
+            if cand and cand.upper() == cand and len(re.sub(r'[^A-Z]', '', cand)) >= 2:
+                names.append(cand)
     # 去重保序
     seen, ordered = set(), []
     for n in names:
@@ -85,16 +137,16 @@ def collect_intel(candidate_urls: list[str]):
     for url in candidate_urls:
         try:
             print(f"[fetch] Intel SDM: {url}")
-            data = fetch_bytes(url)
-            return parse_pdf_for_mnemonics(data)
+            with open_pdf(url) as fp:
+                return parse_pdf_for_mnemonics(fp)
         except Exception as e:
             last_err = e
             continue
     raise last_err if last_err else RuntimeError("No Intel SDM PDF fetched")
 
 def collect_amd(url: str):
-    data = fetch_bytes(url)
-    return parse_pdf_for_mnemonics(data)
+    with open_pdf(url) as fp:
+        return parse_pdf_for_mnemonics(fp)
 
 def main():
     ap = argparse.ArgumentParser(description="x86 指令名抓取（Intel/AMD）")
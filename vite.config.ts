@@ -5,6 +5,12 @@ import path from 'path'
 export default defineConfig({
   plugins: [react()],
   base: '/ISA-Cosmos/',
+  server: {
+    // 开发时按需渲染指令 stub（python src/instructions/stub_server.py）
+    proxy: {
+      '/instructions': 'http://127.0.0.1:8787',
+    },
+  },
   resolve: {
     alias: {
       '@': path.resolve(__dirname, 'src'),